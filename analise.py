@@ -0,0 +1,182 @@
+"""Análise em lote de posições (EPD ou PGN) com um grupo de processos.
+
+As posições são lidas do arquivo aos poucos, distribuídas aos processos com
+no máximo `--in-flight` buscas pendentes (a memória não cresce com o
+tamanho da entrada) e os resultados saem em JSONL na ordem em que ficam
+prontos:
+
+    python xadrez.py analyze partidas.pgn --time 0.5 --output analise.jsonl
+    python xadrez.py analyze testes.epd --depth 6 --workers 4 --output analise.jsonl --resume
+
+Com `--resume`, as posições já gravadas na saída (pelo campo `index`) são
+puladas e os novos resultados são acrescentados ao fim do arquivo.
+"""
+import argparse
+import concurrent.futures
+import json
+import math
+import os
+import sys
+import time
+
+import chess
+import chess.pgn
+
+from processos import pool_size, process_pool, search_position
+
+DEFAULT_TIME = 1.0  # segundos por posição quando nem tempo nem profundidade são dados
+
+
+def iter_epd(path: str):
+    """Posições de um arquivo EPD, uma por linha: (id, fen, lance jogado)."""
+    with open(path, encoding="utf-8") as file:
+        for number, line in enumerate(file, 1):
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            try:
+                board, operations = chess.Board.from_epd(line)
+            except ValueError as error:
+                print(f"{path}:{number}: EPD inválido, linha ignorada ({error})", file=sys.stderr)
+                continue
+            yield str(operations.get("id", f"{os.path.basename(path)}:{number}")), board.fen(), None
+
+
+def iter_pgn(path: str):
+    """Posições antes de cada lance da linha principal de cada partida: (id, fen, lance jogado)."""
+    with open(path, encoding="utf-8", errors="replace") as file:
+        game_number = 0
+        while True:
+            game = chess.pgn.read_game(file)
+            if game is None:
+                break
+            game_number += 1
+            board = game.board()
+            for ply, move in enumerate(game.mainline_moves()):
+                yield f"{game_number}:{ply}", board.fen(), move.uci()
+                board.push(move)
+
+
+def iter_positions(path: str):
+    """Escolhe o leitor pela extensão (.pgn ou EPD)."""
+    if path.lower().endswith(".pgn"):
+        return iter_pgn(path)
+    return iter_epd(path)
+
+
+def analyze_position(index: int, position_id: str, fen: str, played: str, time_limit: float, depth: int) -> dict:
+    """Executada nos processos do grupo: busca uma posição e devolve o registro JSONL."""
+    board = chess.Board(fen)
+    start = time.perf_counter()
+    move, stats = search_position(
+        board, time_limit, max_depth=depth, use_book=False,
+        use_cache=False,  # nós, tempo e profundidade precisam vir desta busca
+    )
+    last = stats.iterations[-1] if stats.iterations else {}
+    return {
+        "index": index,
+        "id": position_id,
+        "fen": fen,
+        "played": played,
+        "move": move.uci() if move else None,
+        "san": board.san(move) if move else None,
+        "score": last.get("value"),  # centipeões, positivo favorece as brancas
+        "depth": stats.depth,
+        "nodes": stats.nodes,
+        "time": round(time.perf_counter() - start, 3),
+    }
+
+
+def completed_indexes(path: str) -> set:
+    """Índices já gravados na saída; descarta uma última linha incompleta (execução interrompida)."""
+    done = set()
+    if not os.path.exists(path):
+        return done
+    with open(path, "rb+") as file:
+        valid_size = 0
+        for line in file:
+            if not line.endswith(b"\n"):
+                break
+            try:
+                done.add(json.loads(line)["index"])
+            except (ValueError, KeyError):
+                break
+            valid_size += len(line)
+        file.truncate(valid_size)
+    return done
+
+
+def run_analysis(
+    path: str,
+    output,
+    time_limit: float = None,
+    depth: int = None,
+    workers: int = None,
+    in_flight: int = None,
+    skip=frozenset(),
+) -> int:
+    """Analisa as posições de `path`, escrevendo cada resultado em `output` assim que fica pronto.
+
+    Uma busca que falha vira um registro com `error` no lugar do lance, e a
+    análise continua (com `--resume`, a posição conta como feita). Devolve a quantidade de posições analisadas nesta execução.
+    """
+    if time_limit is None:
+        time_limit = math.inf if depth else DEFAULT_TIME
+    workers = pool_size(workers)
+    in_flight = in_flight or 2 * workers
+    written = 0
+    with process_pool(workers) as pool:
+        pending = {}  # futuro -> (índice, id)
+
+        def drain(until: int):
+            nonlocal written
+            while len(pending) > until:
+                done, _ = concurrent.futures.wait(pending, return_when=concurrent.futures.FIRST_COMPLETED)
+                for future in done:
+                    index, position_id = pending.pop(future)
+                    try:
+                        record = future.result()
+                    except Exception as error:
+                        print(f"posição {position_id}: falha na análise ({error!r})", file=sys.stderr)
+                        record = {"index": index, "id": position_id, "error": repr(error)}
+                    output.write(json.dumps(record, ensure_ascii=False) + "\n")
+                    output.flush()
+                    written += 1
+
+        for index, (position_id, fen, played) in enumerate(iter_positions(path)):
+            if index in skip:
+                continue
+            future = pool.submit(analyze_position, index, position_id, fen, played, time_limit, depth)
+            pending[future] = (index, position_id)
+            drain(in_flight - 1)  # limita o trabalho pendente
+        drain(0)
+    return written
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="analyze", description="Análise em lote de arquivos EPD ou PGN.")
+    parser.add_argument("input", help="arquivo .epd ou .pgn")
+    parser.add_argument("--output", "-o", help="arquivo JSONL de saída (padrão: saída padrão)")
+    parser.add_argument("--time", type=float, help=f"segundos por posição (padrão: {DEFAULT_TIME} sem --depth)")
+    parser.add_argument("--depth", type=int, help="profundidade máxima por posição")
+    parser.add_argument("--workers", type=int, help="processos de análise (padrão: um por CPU)")
+    parser.add_argument("--in-flight", type=int, help="máximo de posições pendentes (padrão: 2 por processo)")
+    parser.add_argument("--resume", action="store_true", help="pula posições já presentes na saída")
+    args = parser.parse_args(argv)
+
+    if args.resume and not args.output:
+        parser.error("--resume exige --output")
+    skip = completed_indexes(args.output) if args.resume else frozenset()
+    start = time.perf_counter()
+    if args.output:
+        with open(args.output, "a" if args.resume else "w", encoding="utf-8") as output:
+            count = run_analysis(args.input, output, args.time, args.depth, args.workers, args.in_flight, skip)
+    else:
+        count = run_analysis(args.input, sys.stdout, args.time, args.depth, args.workers, args.in_flight)
+    elapsed = time.perf_counter() - start
+    print(f"{count} posições analisadas em {elapsed:.1f}s ({len(skip)} retomadas)", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,250 @@
+import chess
+import chess.polyglot
+
+from transposicao import PIECE_KEYS, pieces_key, state_key
+
+# Valores de peça simplificados
+PIECE_VALUES = {
+    chess.PAWN: 100,
+    chess.KNIGHT: 320,
+    chess.BISHOP: 330,
+    chess.ROOK: 500,
+    chess.QUEEN: 900,
+    chess.KING: 0,
+}
+
+# Tabelas peça-casa ("Simplified Evaluation Function"), do ponto de vista das
+# brancas, com a 8ª fileira na primeira linha.
+PIECE_SQUARE_TABLES = {
+    chess.PAWN: [
+        0, 0, 0, 0, 0, 0, 0, 0,
+        50, 50, 50, 50, 50, 50, 50, 50,
+        10, 10, 20, 30, 30, 20, 10, 10,
+        5, 5, 10, 25, 25, 10, 5, 5,
+        0, 0, 0, 20, 20, 0, 0, 0,
+        5, -5, -10, 0, 0, -10, -5, 5,
+        5, 10, 10, -20, -20, 10, 10, 5,
+        0, 0, 0, 0, 0, 0, 0, 0,
+    ],
+    chess.KNIGHT: [
+        -50, -40, -30, -30, -30, -30, -40, -50,
+        -40, -20, 0, 0, 0, 0, -20, -40,
+        -30, 0, 10, 15, 15, 10, 0, -30,
+        -30, 5, 15, 20, 20, 15, 5, -30,
+        -30, 0, 15, 20, 20, 15, 0, -30,
+        -30, 5, 10, 15, 15, 10, 5, -30,
+        -40, -20, 0, 5, 5, 0, -20, -40,
+        -50, -40, -30, -30, -30, -30, -40, -50,
+    ],
+    chess.BISHOP: [
+        -20, -10, -10, -10, -10, -10, -10, -20,
+        -10, 0, 0, 0, 0, 0, 0, -10,
+        -10, 0, 5, 10, 10, 5, 0, -10,
+        -10, 5, 5, 10, 10, 5, 5, -10,
+        -10, 0, 10, 10, 10, 10, 0, -10,
+        -10, 10, 10, 10, 10, 10, 10, -10,
+        -10, 5, 0, 0, 0, 0, 5, -10,
+        -20, -10, -10, -10, -10, -10, -10, -20,
+    ],
+    chess.ROOK: [
+        0, 0, 0, 0, 0, 0, 0, 0,
+        5, 10, 10, 10, 10, 10, 10, 5,
+        -5, 0, 0, 0, 0, 0, 0, -5,
+        -5, 0, 0, 0, 0, 0, 0, -5,
+        -5, 0, 0, 0, 0, 0, 0, -5,
+        -5, 0, 0, 0, 0, 0, 0, -5,
+        -5, 0, 0, 0, 0, 0, 0, -5,
+        0, 0, 0, 5, 5, 0, 0, 0,
+    ],
+    chess.QUEEN: [
+        -20, -10, -10, -5, -5, -10, -10, -20,
+        -10, 0, 0, 0, 0, 0, 0, -10,
+        -10, 0, 5, 5, 5, 5, 0, -10,
+        -5, 0, 5, 5, 5, 5, 0, -5,
+        0, 0, 5, 5, 5, 5, 0, -5,
+        -10, 5, 5, 5, 5, 5, 0, -10,
+        -10, 0, 5, 0, 0, 0, 0, -10,
+        -20, -10, -10, -5, -5, -10, -10, -20,
+    ],
+    chess.KING: [
+        -30, -40, -40, -50, -50, -40, -40, -30,
+        -30, -40, -40, -50, -50, -40, -40, -30,
+        -30, -40, -40, -50, -50, -40, -40, -30,
+        -30, -40, -40, -50, -50, -40, -40, -30,
+        -20, -30, -30, -40, -40, -30, -30, -20,
+        -10, -20, -20, -20, -20, -20, -20, -10,
+        20, 20, 0, 0, 0, 0, 20, 20,
+        20, 30, 10, 0, 0, 10, 30, 20,
+    ],
+}
+
+# Contribuição (material + tabela) de cada peça em cada casa, já com o sinal
+# da cor: SQUARE_SCORE[cor][tipo][casa]. Positivo favorece as brancas.
+SQUARE_SCORE = {
+    chess.WHITE: {
+        piece_type: [PIECE_VALUES[piece_type] + table[square ^ 56] for square in chess.SQUARES]
+        for piece_type, table in PIECE_SQUARE_TABLES.items()
+    },
+    chess.BLACK: {
+        piece_type: [-(PIECE_VALUES[piece_type] + table[square]) for square in chess.SQUARES]
+        for piece_type, table in PIECE_SQUARE_TABLES.items()
+    },
+}
+
+# Final contra rei sozinho: no lugar das tabelas dos reis (feitas para o meio-jogo),
+# o lado com peças empurra o rei adversário para a borda e aproxima o próprio
+MOP_UP_EDGE = 10  # por casa de distância do rei sozinho até o centro
+MOP_UP_KINGS = 4  # por casa a menos entre os reis (distância Manhattan)
+CENTER_DISTANCE = [
+    max(3 - chess.square_file(square), chess.square_file(square) - 4)
+    + max(3 - chess.square_rank(square), chess.square_rank(square) - 4)
+    for square in chess.SQUARES
+]
+
+# Ativa a conferência da avaliação incremental contra o cálculo completo
+DEBUG_EVAL = False
+
+
+def material_score(board: chess.BaseBoard) -> int:
+    """Material mais tabelas peça-casa, calculado do zero."""
+    score = 0
+    for square, piece in board.piece_map().items():
+        score += SQUARE_SCORE[piece.color][piece.piece_type][square]
+    return score
+
+
+def mop_up_score(board: chess.BaseBoard) -> int:
+    """Correção de final contra rei sozinho (positivo favorece as brancas); 0 nas demais posições.
+
+    Soma-se a `score`: tira a contribuição das tabelas dos reis e põe o bônus de borda e de proximidade.
+    """
+    for strong in (chess.WHITE, chess.BLACK):
+        weak = board.occupied_co[not strong]
+        if weak == weak & board.kings and board.occupied_co[strong] & ~(board.kings | board.pawns):
+            strong_king, weak_king = board.king(strong), board.king(not strong)
+            if strong_king is None or weak_king is None:
+                return 0
+            bonus = MOP_UP_EDGE * CENTER_DISTANCE[weak_king]
+            bonus += MOP_UP_KINGS * (14 - chess.square_manhattan_distance(strong_king, weak_king))
+            tables = SQUARE_SCORE[strong][chess.KING][strong_king] + SQUARE_SCORE[not strong][chess.KING][weak_king]
+            return (bonus if strong == chess.WHITE else -bonus) - tables
+    return 0
+
+
+class SearchBoard(chess.Board):
+    """Tabuleiro de busca que mantém `score` (material + peça-casa) e a chave
+    Zobrist (`zobrist_key`) a cada push/pop.
+
+    Apenas `push` e `pop` atualizam pontuação e chave; use `from_board` para
+    criar o tabuleiro a partir de uma partida e `refresh` após alterá-lo por
+    outros meios. As chaves anteriores ficam guardadas, o que torna a detecção
+    de repetição (`is_repeated`) barata.
+    """
+
+    def __init__(self, fen=chess.STARTING_FEN, *, chess960=False, debug=None):
+        self.debug = DEBUG_EVAL if debug is None else debug
+        self._score_stack = []
+        self._key_stack = []  # (chave das peças, chave completa) antes de cada lance
+        self.score = 0
+        self._pieces_key = 0
+        self.zobrist_key = 0
+        super().__init__(fen, chess960=chess960)
+        self.refresh()
+
+    @classmethod
+    def from_board(cls, board: chess.Board, debug=None) -> "SearchBoard":
+        """Cria o tabuleiro de busca repetindo a partida, preservando o histórico."""
+        root = board.root()
+        search_board = cls(root.fen(), chess960=board.chess960, debug=debug)
+        for move in board.move_stack:
+            search_board.push(move)
+        return search_board
+
+    def refresh(self):
+        """Recalcula pontuação e chave do zero e descarta os históricos."""
+        self.score = material_score(self)
+        self._score_stack = [self.score] * len(self.move_stack)
+        self._pieces_key = pieces_key(self)
+        self.zobrist_key = self._pieces_key ^ state_key(self)
+        self._key_stack = [(self._pieces_key, None)] * len(self.move_stack)
+
+    def copy(self, *, stack=True):
+        board = super().copy(stack=stack)
+        board.debug = self.debug
+        board.score = self.score
+        board._pieces_key = self._pieces_key
+        board.zobrist_key = self.zobrist_key
+        kept = len(board.move_stack)
+        board._score_stack = self._score_stack[len(self._score_stack) - kept:] if kept else []
+        board._key_stack = self._key_stack[len(self._key_stack) - kept:] if kept else []
+        return board
+
+    def is_repeated(self) -> bool:
+        """A posição já ocorreu desde o último lance irreversível (captura ou peão)."""
+        stack = self._key_stack
+        key = self.zobrist_key
+        for distance in range(4, min(self.halfmove_clock, len(stack)) + 1, 2):
+            if stack[-distance][1] == key:
+                return True
+        return False
+
+    def push(self, move: chess.Move):
+        score = self.score
+        pieces = self._pieces_key
+        self._score_stack.append(score)
+        self._key_stack.append((pieces, self.zobrist_key))
+        if move:
+            color = self.turn
+            piece_type = self.piece_type_at(move.from_square)
+            own = SQUARE_SCORE[color]
+            own_keys = PIECE_KEYS[color]
+            from_square, to_square = move.from_square, move.to_square
+
+            if piece_type == chess.KING and self.is_castling(move):
+                rank = chess.square_rank(from_square)
+                kingside = self.is_kingside_castling(move)
+                if self.piece_type_at(to_square) == chess.ROOK:
+                    rook_from = to_square  # notação "rei captura torre"
+                else:
+                    rook_from = chess.square(7 if kingside else 0, rank)
+                king_to = chess.square(6 if kingside else 2, rank)
+                rook_to = chess.square(5 if kingside else 3, rank)
+                king, rook = own[chess.KING], own[chess.ROOK]
+                score += king[king_to] - king[from_square] + rook[rook_to] - rook[rook_from]
+                king, rook = own_keys[chess.KING], own_keys[chess.ROOK]
+                pieces ^= king[king_to] ^ king[from_square] ^ rook[rook_to] ^ rook[rook_from]
+            else:
+                table = own[piece_type]
+                keys = own_keys[piece_type]
+                score -= table[from_square]
+                pieces ^= keys[from_square]
+                if move.promotion:
+                    score += own[move.promotion][to_square]
+                    pieces ^= own_keys[move.promotion][to_square]
+                else:
+                    score += table[to_square]
+                    pieces ^= keys[to_square]
+                captured = self.piece_type_at(to_square)
+                if captured:
+                    score -= SQUARE_SCORE[not color][captured][to_square]
+                    pieces ^= PIECE_KEYS[not color][captured][to_square]
+                elif piece_type == chess.PAWN and to_square == self.ep_square:
+                    victim_square = to_square - 8 if color == chess.WHITE else to_square + 8
+                    score -= SQUARE_SCORE[not color][chess.PAWN][victim_square]
+                    pieces ^= PIECE_KEYS[not color][chess.PAWN][victim_square]
+
+        super().push(move)
+        self.score = score
+        self._pieces_key = pieces
+        self.zobrist_key = pieces ^ state_key(self)
+        if self.debug:
+            assert score == material_score(self), f"avaliação incremental divergiu após {move}"
+            assert self.zobrist_key == chess.polyglot.zobrist_hash(self), f"chave incremental divergiu após {move}"
+
+    def pop(self) -> chess.Move:
+        move = super().pop()
+        self.score = self._score_stack.pop()
+        self._pieces_key, self.zobrist_key = self._key_stack.pop()
+        if self.debug:
+            assert self.score == material_score(self), f"avaliação incremental divergiu ao desfazer {move}"
+        return move
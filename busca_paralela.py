@@ -0,0 +1,227 @@
+"""Busca Lazy SMP: vários processos aprofundam a mesma raiz compartilhando a tabela.
+
+Uso como benchmark de escalabilidade (tempo até a profundidade):
+
+    python busca_paralela.py --depth 5 --workers 1 2 4 8 16
+"""
+import argparse
+import atexit
+import math
+import multiprocessing
+import queue
+import time
+
+import chess
+
+from avaliacao import PIECE_VALUES, SearchBoard
+from controle import SearchControl
+from motor import aspiration_search
+from ordenacao import MoveOrderer
+from transposicao import TT_SIZE_MB, SharedTranspositionTable
+
+# Posições usadas pelo benchmark de escalabilidade
+BENCH_FENS = [
+    chess.STARTING_FEN,
+    "r1bqkbnr/pppp1ppp/2n5/4p3/4P3/5N2/PPPP1PPP/RNBQKB1R w KQkq - 2 3",
+    "r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1",
+    "8/2p5/3p4/KP5r/1R3p1k/8/4P1P1/8 w - - 0 1",
+]
+
+POLL_INTERVAL = 0.05  # segundos entre verificações de parada do coordenador
+STOP_GRACE = 2.0  # segundos para os processos responderem depois da parada
+
+
+def _worker_main(worker_id, tt_size_mb, tt_name, tasks, results, stop_event):
+    """Laço de um processo auxiliar: espera uma raiz, aprofunda até ser parado."""
+    tt = SharedTranspositionTable.attach(tt_size_mb, tt_name)
+    orderer = MoveOrderer(PIECE_VALUES)
+    while True:
+        task = tasks.get()
+        if task is None:
+            break
+        board, time_limit, soft_limit, max_depth = task
+        search_board = SearchBoard.from_board(board)
+        control = SearchControl(time_limit, stop_event, soft_limit=soft_limit)
+        tt.new_search()
+        orderer.new_search()
+        if worker_id:
+            orderer.perturb_history(worker_id)
+
+        # Profundidades escalonadas: metade dos auxiliares começa um ply adiante
+        depth = 1 + worker_id % 2
+        best_move = None
+        previous = None
+        while max_depth is None or depth <= max_depth:
+            if not control.can_start_iteration():
+                break  # parada, limite rígido ou limite suave do relógio
+            control.begin_iteration()
+            value, move = aspiration_search(search_board, depth, control, tt, orderer, best_move, previous)
+            if move is None or control.stopped():
+                break  # iteração incompleta não é publicada
+            control.end_iteration()
+            best_move = move
+            previous = value
+            results.put(("iteration", worker_id, depth, value, move.uci(), control.nodes))
+            depth += 1
+        results.put(("done", worker_id, control.nodes))
+    tt.close()
+
+
+class ParallelSearcher:
+    """Coordena `workers` processos persistentes com uma tabela de transposição compartilhada."""
+
+    def __init__(self, workers: int, tt_size_mb: float = TT_SIZE_MB):
+        context = multiprocessing.get_context("spawn")
+        self.workers = workers
+        self.tt = SharedTranspositionTable(tt_size_mb)
+        self.stop_event = context.Event()
+        self.results = context.Queue()
+        self.tasks = [context.Queue() for _ in range(workers)]
+        self.processes = [
+            context.Process(
+                target=_worker_main,
+                args=(i, tt_size_mb, self.tt.name, self.tasks[i], self.results, self.stop_event),
+                name=f"lazy-smp-{i}",
+                daemon=True,
+            )
+            for i in range(workers)
+        ]
+        for process in self.processes:
+            process.start()
+        self.nodes = 0
+        self.depth = 0
+        self.value = None
+        self.broken = False  # algum processo morreu ou travou: o grupo precisa ser recriado
+
+    def search(
+        self,
+        board: chess.Board,
+        time_limit: float,
+        max_depth: int = None,
+        control: SearchControl = None,
+        on_iteration=None,
+    ):
+        """Busca em paralelo e devolve o lance da iteração completa mais profunda.
+
+        Os processos recebem o que resta dos limites rígido e suave de
+        `control`. Se algum processo morrer, ou não responder em `STOP_GRACE`
+        segundos depois da parada, a busca devolve o melhor lance recebido
+        até então e o grupo fica marcado como `broken`.
+        """
+        if control is None:
+            control = SearchControl(time_limit)
+        self.stop_event.clear()
+        elapsed = control.elapsed()
+        task = (board, control.time_limit - elapsed, control.soft_limit - elapsed, max_depth)
+        for tasks in self.tasks:
+            tasks.put(task)
+
+        best_depth, best_value, best_move = 0, None, None
+        nodes = [0] * self.workers
+        finished = [False] * self.workers
+        stopped_at = None
+        while not all(finished):
+            if stopped_at is None and (control.stopped() or (max_depth is not None and best_depth >= max_depth)):
+                self.stop_event.set()
+                stopped_at = time.monotonic()
+            try:
+                message = self.results.get(timeout=POLL_INTERVAL)
+            except queue.Empty:
+                dead = [i for i, process in enumerate(self.processes) if not finished[i] and not process.is_alive()]
+                late = stopped_at is not None and time.monotonic() - stopped_at > STOP_GRACE
+                if late:
+                    self.broken = True
+                    break
+                if dead:
+                    # Os demais param e entregam o que já concluíram
+                    self.broken = True
+                    self.stop_event.set()
+                    stopped_at = stopped_at or time.monotonic()
+                    for i in dead:
+                        finished[i] = True
+                continue
+            if message[0] == "done":
+                _, worker_id, worker_nodes = message
+                nodes[worker_id] = worker_nodes
+                finished[worker_id] = True
+                continue
+            _, worker_id, depth, value, uci, worker_nodes = message
+            nodes[worker_id] = worker_nodes
+            control.nodes = sum(nodes)
+            if depth > best_depth:
+                best_depth, best_value, best_move = depth, value, chess.Move.from_uci(uci)
+                if on_iteration is not None:
+                    on_iteration(depth, value, best_move)
+
+        self.nodes = control.nodes = sum(nodes)
+        self.depth = best_depth
+        self.value = best_value
+        return best_move
+
+    def close(self):
+        for tasks in self.tasks:
+            tasks.put(None)
+        for process in self.processes:
+            process.join(timeout=1)
+            if process.is_alive():
+                process.terminate()
+        self.tt.close()
+
+
+_searchers = {}
+
+
+def get_searcher(workers: int, tt_size_mb: float = TT_SIZE_MB) -> ParallelSearcher:
+    """Devolve (criando na primeira vez) o grupo persistente com `workers` processos.
+
+    O grupo é recriado se a tabela pedida tiver outro tamanho.
+    """
+    searcher = _searchers.get(workers)
+    if searcher is not None and (searcher.broken or searcher.tt.size_mb != tt_size_mb):
+        searcher.close()
+        searcher = None
+    if searcher is None:
+        searcher = _searchers[workers] = ParallelSearcher(workers, tt_size_mb)
+    return searcher
+
+
+@atexit.register
+def _close_searchers():
+    for searcher in _searchers.values():
+        searcher.close()
+    _searchers.clear()
+
+
+def run_scaling_benchmark(depth: int, worker_counts, fens=BENCH_FENS):
+    """Mede o tempo até `depth` para cada quantidade de processos e imprime o ganho."""
+    print(f"Lazy SMP – tempo até profundidade {depth} ({len(fens)} posições)")
+    print(f"{'processos':>9} {'tempo (s)':>10} {'nós':>10} {'ganho':>7}")
+    baseline = None
+    for workers in worker_counts:
+        searcher = ParallelSearcher(workers)
+        try:
+            total_time = 0.0
+            total_nodes = 0
+            for fen in fens:
+                searcher.tt.clear()
+                start = time.perf_counter()
+                searcher.search(chess.Board(fen), math.inf, max_depth=depth)
+                total_time += time.perf_counter() - start
+                total_nodes += searcher.nodes
+        finally:
+            searcher.close()
+        if baseline is None:
+            baseline = total_time
+        print(f"{workers:>9} {total_time:>10.2f} {total_nodes:>10} {baseline / total_time:>6.2f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de escalabilidade da busca Lazy SMP.")
+    parser.add_argument("--depth", type=int, default=5, help="profundidade alvo")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8, 16], help="quantidades de processos")
+    args = parser.parse_args()
+    run_scaling_benchmark(args.depth, args.workers)
+
+
+if __name__ == "__main__":
+    main()
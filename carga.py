@@ -0,0 +1,211 @@
+"""Teste de carga do servidor de partidas (`servidor.py`).
+
+Simula centenas de partidas simultâneas, divididas entre algumas conexões.
+Em cada partida o cliente joga de brancas com lances aleatórios e o motor
+responde de pretas; respostas `busy` são repetidas com espera exponencial:
+
+    python xadrez.py serve --workers 4 &
+    python xadrez.py loadtest --games 300 --connections 30 --plies 20 --time 0.05
+
+Com `--serve`, um servidor é iniciado no próprio processo (porta livre) e
+o teste não depende de outro terminal. No fim são mostrados a vazão, os
+percentis de latência vistos pelo cliente e as métricas do servidor.
+"""
+import argparse
+import asyncio
+import collections
+import json
+import random
+import sys
+import time
+
+import chess
+
+from estatisticas import percentile
+from servidor import HOST, PORT, QUEUE_LIMIT, GameServer
+
+BUSY_BACKOFF = 0.05  # primeira espera depois de um busy, em segundos
+MAX_BACKOFF = 2.0
+
+
+class Connection:
+    """Conexão com o servidor, repartida entre várias partidas pelas respostas com identificador."""
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self._reader = reader
+        self._writer = writer
+        self._games = collections.defaultdict(asyncio.Queue)  # id -> respostas da partida
+        self._requests = collections.deque()  # futuros de `new`/`stats`, respondidos em ordem
+        self._read_task = asyncio.create_task(self._read_loop())
+
+    @classmethod
+    async def open(cls, host: str, port: int) -> "Connection":
+        reader, writer = await asyncio.open_connection(host, port)
+        return cls(reader, writer)
+
+    async def close(self):
+        self._writer.write(b"quit\n")
+        await self._writer.drain()
+        await self._read_task  # o servidor fecha a conexão depois do quit
+        self._writer.close()
+        await self._writer.wait_closed()
+
+    async def _read_loop(self):
+        while True:
+            raw = await self._reader.readline()
+            if not raw:
+                break
+            kind, _, rest = raw.decode().strip().partition(" ")
+            if kind in ("game", "stats") or (kind == "error" and rest.startswith("-")):
+                future = self._requests.popleft()
+                if kind == "error":
+                    future.set_exception(RuntimeError(rest))
+                else:
+                    future.set_result(rest)
+            else:
+                game_id, _, rest = rest.partition(" ")
+                self._games[int(game_id)].put_nowait((kind, rest.split()))
+        for future in self._requests:
+            future.set_exception(ConnectionError("conexão encerrada pelo servidor"))
+
+    async def _request(self, line: str) -> str:
+        future = asyncio.get_running_loop().create_future()
+        self._requests.append(future)
+        await self.send(line)
+        return await future
+
+    async def send(self, line: str):
+        self._writer.write((line + "\n").encode())
+        await self._writer.drain()
+
+    async def reply(self, game_id: int):
+        """Próxima resposta da partida: (tipo, argumentos)."""
+        return await self._games[game_id].get()
+
+    async def new_game(self, move_time: float) -> int:
+        return int(await self._request(f"new {move_time}"))
+
+    async def stats(self) -> dict:
+        return json.loads(await self._request("stats"))
+
+
+class LoadResults:
+    def __init__(self):
+        self.games = 0
+        self.moves = 0
+        self.busy = 0
+        self.errors = 0
+        self.latencies = []
+
+
+async def play_game(connection: Connection, rng: random.Random, plies: int, move_time: float, results: LoadResults):
+    """Uma partida: brancas aleatórias no cliente, pretas pelo motor no servidor."""
+    game_id = await connection.new_game(move_time)
+    board = chess.Board()
+    while board.ply() < plies and not board.is_game_over():
+        if board.turn == chess.WHITE:
+            move = rng.choice(list(board.legal_moves))
+            await connection.send(f"move {game_id} {move.uci()}")
+            kind, _ = await connection.reply(game_id)
+            if kind != "moved":
+                results.errors += 1
+                break
+            board.push(move)
+            continue
+        backoff = BUSY_BACKOFF
+        while True:
+            start = time.perf_counter()
+            await connection.send(f"go {game_id}")
+            kind, args = await connection.reply(game_id)
+            if kind != "busy":
+                break
+            results.busy += 1
+            await asyncio.sleep(backoff * (0.5 + rng.random()))  # espalha as novas tentativas
+            backoff = min(backoff * 2, MAX_BACKOFF)
+        if kind != "bestmove":
+            results.errors += kind == "error"
+            break
+        results.latencies.append(time.perf_counter() - start)
+        results.moves += 1
+        board.push_uci(args[0])
+    await connection.send(f"close {game_id}")
+    await connection.reply(game_id)
+    results.games += 1
+
+
+async def run_load(
+    host: str,
+    port: int,
+    games: int,
+    connections: int,
+    plies: int,
+    move_time: float,
+    seed: int = 0,
+    serve_workers: int = None,
+    queue_limit: int = QUEUE_LIMIT,
+):
+    """Joga `games` partidas ao mesmo tempo e imprime o resumo do cliente e do servidor."""
+    game_server = server = None
+    if serve_workers is not None:
+        game_server = GameServer(serve_workers or None, queue_limit)
+        server = await game_server.start(host, 0)
+        port = server.sockets[0].getsockname()[1]
+    try:
+        links = [await Connection.open(host, port) for _ in range(max(1, min(connections, games)))]
+        results = LoadResults()
+        start = time.perf_counter()
+        await asyncio.gather(*(
+            play_game(links[i % len(links)], random.Random(seed + i), plies, move_time, results)
+            for i in range(games)
+        ))
+        elapsed = time.perf_counter() - start
+        server_stats = await links[0].stats()
+        for link in links:
+            await link.close()
+    finally:
+        if server is not None:
+            server.close()
+            game_server.close()
+
+    latencies = results.latencies
+    print(f"{results.games} partidas em {len(links)} conexões, {results.moves} lances do motor em {elapsed:.1f}s")
+    print(f"Vazão: {results.moves / elapsed:.1f} lances/s; busy: {results.busy}; erros: {results.errors}")
+    print(
+        f"Latência no cliente: p50 {percentile(latencies, 0.50) * 1000:.0f} ms, "
+        f"p90 {percentile(latencies, 0.90) * 1000:.0f} ms, p99 {percentile(latencies, 0.99) * 1000:.0f} ms"
+    )
+    print("Servidor: " + json.dumps(server_stats, indent=2))
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="loadtest", description="Teste de carga do servidor de partidas.")
+    parser.add_argument("--host", default=HOST)
+    parser.add_argument("--port", type=int, default=PORT)
+    parser.add_argument("--games", type=int, default=200, help="partidas simultâneas")
+    parser.add_argument("--connections", type=int, default=20, help="conexões TCP entre as quais as partidas são divididas")
+    parser.add_argument("--plies", type=int, default=20, help="meios-lances por partida")
+    parser.add_argument("--time", type=float, default=0.05, help="segundos por lance do motor")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--serve", type=int, nargs="?", const=0, metavar="PROCESSOS",
+        help="inicia um servidor neste processo (padrão: um processo por CPU)",
+    )
+    parser.add_argument("--queue-limit", type=int, default=QUEUE_LIMIT, help="limite da fila do servidor iniciado com --serve")
+    args = parser.parse_args(argv)
+    asyncio.run(run_load(
+        args.host,
+        args.port,
+        args.games,
+        args.connections,
+        args.plies,
+        args.time,
+        args.seed,
+        args.serve,
+        args.queue_limit,
+    ))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,118 @@
+import math
+import time
+
+CHECK_INTERVAL = 1024  # nós entre consultas ao relógio e ao pedido de parada
+DEFAULT_MOVES_TO_GO = 30  # lances restantes estimados quando o controle não informa
+MOVE_OVERHEAD = 0.05  # segundos reservados para comunicação/latência por lance
+HARD_LIMIT_FACTOR = 3  # limite rígido = até 3x o limite suave (sem passar do relógio)
+
+
+class SearchControl:
+    """Controle de tempo de uma busca: relógio, pedido de parada e contagem de nós.
+
+    O relógio monotônico só é consultado a cada `check_interval` nós. Há dois
+    limites: `soft_limit`, a partir do qual nenhuma nova profundidade é
+    iniciada, e `time_limit` (rígido), que interrompe a busca no meio. Antes de
+    cada iteração o custo da próxima é estimado pelo fator de ramificação
+    efetivo medido, e a profundidade não é iniciada se não couber no limite.
+
+    `stop_event` é qualquer objeto com `is_set()` (por exemplo um
+    `threading.Event`), usado para cancelar a busca de fora. Com
+    `node_limit`, a busca também para ao atingir esse número de nós
+    (conferido junto com o relógio).
+    """
+
+    def __init__(
+        self,
+        time_limit: float,
+        stop_event=None,
+        soft_limit: float = None,
+        check_interval: int = CHECK_INTERVAL,
+        node_limit: int = None,
+    ):
+        self.start_time = time.monotonic()
+        self.stop_event = stop_event
+        self.node_limit = node_limit
+        if node_limit:
+            check_interval = max(1, min(check_interval, node_limit))
+        self.check_interval = check_interval
+        self.set_time_limit(time_limit, soft_limit)
+        self.nodes = 0
+        self.leaves = 0  # posições avaliadas estaticamente (stand pat)
+        self.qnodes = 0  # nós da busca de quiescência (também contados em `nodes`)
+        self.quiescence_limit = 0  # orçamento de quiescência da folha atual
+        self.next_check = check_interval
+        self.aborted = False
+        self.iteration_nodes = []  # nós gastos em cada profundidade concluída
+        self.iteration_times = []  # segundos gastos em cada profundidade concluída
+        self._iteration_start = (self.start_time, 0)
+
+    @classmethod
+    def from_clock(
+        cls,
+        remaining: float,
+        increment: float = 0.0,
+        moves_to_go: int = None,
+        stop_event=None,
+        overhead: float = MOVE_OVERHEAD,
+        node_limit: int = None,
+    ) -> "SearchControl":
+        """Orçamento a partir do relógio da partida (tempo restante, incremento, lances até o controle)."""
+        moves_to_go = moves_to_go or DEFAULT_MOVES_TO_GO
+        available = max(remaining - overhead, 0.0)
+        soft = min(available / moves_to_go + 0.75 * increment, available)
+        hard = min(soft * HARD_LIMIT_FACTOR, available / 2 + increment, available)
+        return cls(max(hard, soft), stop_event, soft_limit=soft, node_limit=node_limit)
+
+    def set_time_limit(self, time_limit: float, soft_limit: float = None):
+        """Define os limites rígido e suave, contados desde o início da busca."""
+        self.time_limit = time_limit
+        self.soft_limit = time_limit if soft_limit is None else min(soft_limit, time_limit)
+
+    def elapsed(self) -> float:
+        return time.monotonic() - self.start_time
+
+    def check(self) -> bool:
+        """Consulta o relógio e o pedido de parada; chamado a cada `check_interval` nós."""
+        self.next_check = self.nodes + self.check_interval
+        if self.stop_event is not None and self.stop_event.is_set():
+            self.aborted = True
+        elif time.monotonic() - self.start_time >= self.time_limit:
+            self.aborted = True
+        elif self.node_limit is not None and self.nodes >= self.node_limit:
+            self.aborted = True
+        return self.aborted
+
+    def stopped(self) -> bool:
+        """True se o tempo rígido acabou ou se a parada foi solicitada."""
+        return self.aborted or self.check()
+
+    def begin_iteration(self):
+        self._iteration_start = (time.monotonic(), self.nodes)
+
+    def end_iteration(self):
+        """Registra custo (tempo e nós) da profundidade que acabou de ser concluída."""
+        started, nodes = self._iteration_start
+        self.iteration_times.append(time.monotonic() - started)
+        self.iteration_nodes.append(self.nodes - nodes)
+
+    def branching_factor(self) -> float:
+        """Fator de ramificação efetivo: razão de nós entre as duas últimas profundidades."""
+        if len(self.iteration_nodes) < 2 or not self.iteration_nodes[-2]:
+            return math.nan
+        return self.iteration_nodes[-1] / self.iteration_nodes[-2]
+
+    def can_start_iteration(self) -> bool:
+        """Decide se vale começar mais uma profundidade."""
+        if self.stopped():
+            return False
+        elapsed = self.elapsed()
+        if elapsed >= self.soft_limit:
+            return False
+        if not self.iteration_times:
+            return True
+        factor = self.branching_factor()
+        if math.isnan(factor):
+            factor = 1.0
+        estimate = self.iteration_times[-1] * max(factor, 1.0)
+        return elapsed + estimate <= self.time_limit
@@ -0,0 +1,201 @@
+"""Benchmark do motor: busca em profundidade fixa sobre posições conhecidas.
+
+O total de nós é uma assinatura determinística do motor (mudou a busca,
+muda o número); nós por segundo medem a velocidade. O relatório pode ser
+gravado em JSON e comparado com uma linha de base:
+
+    python xadrez.py bench --depth 4 --json atual.json --baseline base.json
+
+Sai com código 1 se o NPS cair mais que `--threshold` em relação à base.
+"""
+import argparse
+import json
+import math
+import platform
+import sys
+import time
+
+import chess
+
+import motor
+from avaliacao import PIECE_VALUES
+from controle import SearchControl
+from ordenacao import MoveOrderer
+from transposicao import TT_SIZE_MB, TranspositionTable
+
+BENCH_DEPTH = 4
+NPS_THRESHOLD = 0.05  # queda de NPS tolerada antes de acusar regressão
+
+# Interruptores da busca seletiva que podem ser desligados pela linha de comando
+PRUNING_SWITCHES = {
+    "null-move": "NULL_MOVE_PRUNING",
+    "lmr": "LATE_MOVE_REDUCTIONS",
+    "futility": "FUTILITY_PRUNING",
+    "reverse-futility": "REVERSE_FUTILITY_PRUNING",
+}
+
+# (categoria, FEN)
+BENCH_POSITIONS = [
+    # Aberturas
+    ("abertura", chess.STARTING_FEN),
+    ("abertura", "rnbqkbnr/pppppppp/8/8/4P3/8/PPPP1PPP/RNBQKBNR b KQkq - 0 1"),
+    ("abertura", "rnbqkbnr/pp1ppppp/8/2p5/4P3/5N2/PPPP1PPP/RNBQKB1R b KQkq - 1 2"),
+    ("abertura", "r1bqkbnr/pppp1ppp/2n5/1B2p3/4P3/5N2/PPPP1PPP/RNBQK2R b KQkq - 3 3"),
+    ("abertura", "rnbqkb1r/pppp1ppp/5n2/4p3/2P5/2N5/PP1PPPPP/R1BQKBNR w KQkq - 2 3"),
+    ("abertura", "rnbqkb1r/ppp1pppp/5n2/3p4/3P4/5N2/PPP1PPPP/RNBQKB1R w KQkq - 2 3"),
+    ("abertura", "rnbqk2r/pppp1ppp/4pn2/8/1bPP4/2N5/PP2PPPP/R1BQKBNR w KQkq - 2 4"),
+    ("abertura", "rnbqkbnr/pp2pppp/2p5/3p4/3PP3/8/PPP2PPP/RNBQKBNR w KQkq - 0 3"),
+    ("abertura", "r1bqkb1r/pppp1ppp/2n2n2/4p2Q/2B1P3/8/PPPP1PPP/RNB1K1NR w KQkq - 4 4"),
+    ("abertura", "rnbqkbnr/ppp2ppp/4p3/3p4/3PP3/8/PPP2PPP/RNBQKBNR w KQkq - 0 3"),
+    # Meio-jogo
+    ("meio-jogo", "r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1"),
+    ("meio-jogo", "r3k2r/Pppp1ppp/1b3nbN/nP6/BBP1P3/q4N2/Pp1P2PP/R2Q1RK1 w kq - 0 1"),
+    ("meio-jogo", "rnbq1k1r/pp1Pbppp/2p5/8/2B5/8/PPP1NnPP/RNBQK2R w KQ - 1 8"),
+    ("meio-jogo", "r4rk1/1pp1qppp/p1np1n2/2b1p1B1/2B1P1b1/P1NP1N2/1PP1QPPP/R4RK1 w - - 0 10"),
+    ("meio-jogo", "r1bq1rk1/pp2bppp/2n1pn2/3p4/2PP4/2N1PN2/PP3PPP/R2QKB1R w KQ - 0 8"),
+    ("meio-jogo", "r2q1rk1/pp1nbppp/2p1pn2/3p4/2PP1B2/2N1PN2/PP3PPP/R2QKB1R w KQ - 3 8"),
+    ("meio-jogo", "2rq1rk1/pb1nbppp/1p2pn2/2pp4/2PP4/1PN1PN2/PB1QBPPP/2R2RK1 w - - 0 12"),
+    ("meio-jogo", "r1b2rk1/2q1bppp/p2p1n2/np2p3/3PP3/5N1P/PPBN1PP1/R1BQR1K1 w - - 0 12"),
+    ("meio-jogo", "3r1rk1/p1q2ppp/1p2pn2/2b5/2P5/1P2BN2/P3QPPP/3R1RK1 w - - 0 18"),
+    ("meio-jogo", "r1bqr1k1/pp3ppp/2np1n2/2p5/2P1P3/2NB1N2/PP3PPP/R2Q1RK1 w - - 0 10"),
+    # Táticas (Win At Chess)
+    ("tática", "2rr3k/pp3pp1/1nnqbN1p/3pN3/2pP4/2P3Q1/PPB4P/R4RK1 w - - 0 1"),
+    ("tática", "8/7p/5k2/5p2/p1p2P2/Pr1pPK2/1P1R3P/8 b - - 0 1"),
+    ("tática", "5rk1/1ppb3p/p1pb4/6q1/3P1p1r/2P1R2P/PP1BQ1P1/5RKN w - - 0 1"),
+    ("tática", "r1bq2rk/pp3pbp/2p1p1pQ/7P/3P4/2PB1N2/PP3PP1/R3KR2 w Q - 0 1"),
+    ("tática", "5k2/6pp/p1qN4/1p1p4/3P4/2PKP2Q/PP3r2/3R4 b - - 0 1"),
+    ("tática", "7k/p7/1R5K/6r1/6p1/6P1/8/8 w - - 0 1"),
+    ("tática", "rnbqkb1r/pppp1ppp/8/4P3/6n1/7P/PPPNPPP1/R1BQKBNR b KQkq - 0 1"),
+    ("tática", "r4q1k/p2bR1rp/2p2Q1N/5p2/5p2/2P5/PP3PPP/R5K1 w - - 0 1"),
+    ("tática", "3q1rk1/p4pp1/2pb3p/3p4/6Pr/1PNQ4/P1PB1PP1/4RRK1 b - - 0 1"),
+    ("tática", "2br2k1/2q3rn/p2NppQ1/2p1P3/Pp5R/4P3/1P3PPP/3R2K1 w - - 0 1"),
+    # Finais
+    ("final", "8/2p5/3p4/KP5r/1R3p1k/8/4P1P1/8 w - - 0 1"),
+    ("final", "8/8/8/4k3/8/8/4P3/4K3 w - - 0 1"),
+    ("final", "8/8/4k3/8/8/8/8/R3K3 w Q - 0 1"),
+    ("final", "8/5pk1/6p1/8/8/6P1/5PK1/8 w - - 0 1"),
+    ("final", "8/8/1p3k2/p1p5/P1P5/1P3K2/8/8 w - - 0 1"),
+    ("final", "6k1/5ppp/8/8/8/8/5PPP/3R2K1 w - - 0 1"),
+    ("final", "8/8/3k4/8/3K4/8/3B4/3N4 w - - 0 1"),
+    ("final", "8/pk6/8/1P6/8/8/5K2/8 w - - 0 1"),
+    ("final", "4k3/8/8/8/8/8/3Q4/4K3 w - - 0 1"),
+    ("final", "1K1k4/1P6/8/8/8/8/r7/2R5 w - - 0 1"),
+]
+
+
+def bench_position(fen: str, depth: int) -> dict:
+    """Busca uma posição até `depth` com tabela e heurísticas novas (resultado reprodutível)."""
+    board = chess.Board(fen)
+    control = SearchControl(math.inf)
+    tt = TranspositionTable(TT_SIZE_MB)
+    orderer = MoveOrderer(PIECE_VALUES)
+    start = time.perf_counter()
+    move = motor.search_best_move(
+        board,
+        math.inf,
+        tt=tt,
+        orderer=orderer,
+        control=control,
+        workers=1,
+        max_depth=depth,
+        use_book=False,
+        use_cache=False,  # nós e tempo precisam vir de uma busca de verdade
+    )
+    elapsed = time.perf_counter() - start
+    ebf = control.branching_factor()
+    return {
+        "fen": fen,
+        "move": move.uci() if move else None,
+        "nodes": control.nodes,
+        "qnodes": control.qnodes,
+        "time": elapsed,
+        "nps": control.nodes / elapsed if elapsed else 0.0,
+        "ebf": None if math.isnan(ebf) else ebf,
+    }
+
+
+def run_bench(depth: int = BENCH_DEPTH, positions=BENCH_POSITIONS, verbose: bool = True) -> dict:
+    """Roda o conjunto de posições e devolve o relatório (pronto para JSON)."""
+    # As tabelas de finais dependem da máquina; fora delas a contagem de nós é reprodutível
+    tablebase, motor.TABLEBASE = motor.TABLEBASE, None
+    results = []
+    try:
+        for index, (category, fen) in enumerate(positions, 1):
+            result = bench_position(fen, depth)
+            result["category"] = category
+            results.append(result)
+            if verbose:
+                ebf = f"{result['ebf']:.2f}" if result["ebf"] is not None else "-"
+                print(
+                    f"{index:>3} {category:<10} {result['move'] or '-':<6} {result['nodes']:>9} nós "
+                    f"({result['qnodes'] / max(result['nodes'], 1):>4.0%} q) {result['time']:>7.2f}s {result['nps']:>9.0f} nós/s  EBF {ebf}"
+                )
+    finally:
+        motor.TABLEBASE = tablebase
+
+    nodes = sum(result["nodes"] for result in results)
+    qnodes = sum(result["qnodes"] for result in results)
+    elapsed = sum(result["time"] for result in results)
+    factors = [result["ebf"] for result in results if result["ebf"]]
+    return {
+        "depth": depth,
+        "positions": len(results),
+        "nodes": nodes,
+        "qnodes": qnodes,
+        "quiescence_share": qnodes / nodes if nodes else 0.0,
+        "time": elapsed,
+        "nps": nodes / elapsed if elapsed else 0.0,
+        # Média geométrica: o EBF é uma razão
+        "ebf": math.exp(sum(map(math.log, factors)) / len(factors)) if factors else None,
+        "pruning": {name: getattr(motor, switch) for name, switch in PRUNING_SWITCHES.items()},
+        "python": platform.python_version(),
+        "results": results,
+    }
+
+
+def compare(report: dict, baseline: dict, threshold: float = NPS_THRESHOLD) -> bool:
+    """Compara com a linha de base; devolve False se o NPS caiu além do limite."""
+    ok = True
+    if baseline.get("depth") == report["depth"] and baseline.get("nodes") != report["nodes"]:
+        print(f"Assinatura mudou: {baseline.get('nodes')} -> {report['nodes']} nós (a busca mudou)")
+    change = report["nps"] / baseline["nps"] - 1 if baseline.get("nps") else 0.0
+    print(f"NPS: {baseline.get('nps', 0):.0f} -> {report['nps']:.0f} ({change:+.1%})")
+    if change < -threshold:
+        print(f"Regressão de desempenho acima de {threshold:.0%}!")
+        ok = False
+    return ok
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="bench", description="Benchmark do motor em profundidade fixa.")
+    parser.add_argument("--depth", type=int, default=BENCH_DEPTH, help="profundidade de cada busca")
+    parser.add_argument("--json", metavar="ARQUIVO", help="grava o relatório em JSON")
+    parser.add_argument("--baseline", metavar="ARQUIVO", help="relatório JSON de referência para comparar")
+    parser.add_argument("--threshold", type=float, default=NPS_THRESHOLD, help="queda de NPS tolerada (fração)")
+    parser.add_argument("--quiet", action="store_true", help="não lista as posições")
+    for name in PRUNING_SWITCHES:
+        parser.add_argument(f"--no-{name}", action="store_true", help=f"desliga a poda {name}")
+    args = parser.parse_args(argv)
+    for name, switch in PRUNING_SWITCHES.items():
+        if getattr(args, "no_" + name.replace("-", "_")):
+            setattr(motor, switch, False)
+
+    report = run_bench(args.depth, verbose=not args.quiet)
+    ebf = f"{report['ebf']:.2f}" if report["ebf"] is not None else "-"
+    print(
+        f"Total: {report['nodes']} nós ({report['quiescence_share']:.0%} em quiescência) em "
+        f"{report['time']:.2f}s, {report['nps']:.0f} nós/s, EBF {ebf}"
+    )
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as file:
+            json.dump(report, file, indent=2, ensure_ascii=False)
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as file:
+            baseline = json.load(file)
+        if not compare(report, baseline, args.threshold):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,103 @@
+"""Estatísticas da busca e perfilamento opcional com cProfile.
+
+Nada aqui roda por nó: os contadores vivem onde já são incrementados
+(`SearchControl.nodes`/`qnodes`/`leaves`, `MoveOrderer.cutoffs`, sondagens da
+tabela) e `SearchStats` só tira uma fotografia deles ao fim de cada
+profundidade.
+"""
+import cProfile
+import math
+import pstats
+import time
+
+
+class SearchStats:
+    """Resumo de uma busca: nós, folhas avaliadas, podas beta e tempo por profundidade."""
+
+    def __init__(self):
+        self.start_time = time.perf_counter()
+        self.elapsed = 0.0
+        self.depth = 0
+        self.nodes = 0
+        self.qnodes = 0
+        self.leaves = 0
+        self.cutoffs = 0
+        self.first_move_cutoffs = 0
+        self.tt_probes = 0
+        self.tt_hits = 0
+        self.iterations = []  # um dicionário por profundidade concluída
+
+    def record_iteration(self, depth, value, move, control, orderer=None, tt=None):
+        """Registra a profundidade que acabou de ser concluída."""
+        self.update(control, orderer, tt)
+        self.depth = depth
+        self.iterations.append({
+            "depth": depth,
+            "value": value,
+            "move": move.uci() if move else None,
+            "nodes": self.nodes,
+            "time": control.iteration_times[-1] if control.iteration_times else self.elapsed,
+            "elapsed": self.elapsed,
+        })
+
+    def update(self, control, orderer=None, tt=None):
+        """Copia os contadores atuais da busca."""
+        self.elapsed = time.perf_counter() - self.start_time
+        self.nodes = control.nodes
+        self.qnodes = control.qnodes
+        self.leaves = control.leaves
+        if orderer is not None:
+            self.cutoffs = orderer.cutoffs
+            self.first_move_cutoffs = orderer.first_move_cutoffs
+        if tt is not None:
+            self.tt_probes = tt.probes
+            self.tt_hits = tt.hits
+
+    def first_move_cutoff_rate(self) -> float:
+        return self.first_move_cutoffs / self.cutoffs if self.cutoffs else 0.0
+
+    def quiescence_share(self) -> float:
+        """Fração dos nós gasta na busca de quiescência."""
+        return self.qnodes / self.nodes if self.nodes else 0.0
+
+    def tt_hit_rate(self) -> float:
+        return self.tt_hits / self.tt_probes if self.tt_probes else 0.0
+
+    def nps(self) -> float:
+        return self.nodes / self.elapsed if self.elapsed else 0.0
+
+    def summary(self) -> str:
+        """Uma linha legível com os números principais."""
+        return (
+            f"profundidade {self.depth}, {self.nodes} nós ({self.nps():.0f} nós/s, "
+            f"{self.quiescence_share():.0%} em quiescência), "
+            f"{self.leaves} folhas, {self.cutoffs} podas (1º lance: {self.first_move_cutoff_rate():.0%}), "
+            f"TT: {self.tt_hits}/{self.tt_probes} acertos ({self.tt_hit_rate():.0%})"
+        )
+
+    def iteration_lines(self):
+        """Linhas por profundidade: nós acumulados e tempo gasto em cada uma."""
+        for it in self.iterations:
+            yield f"  prof. {it['depth']:>2}: {it['move']} valor {it['value']} – {it['nodes']} nós, {it['time']:.2f}s"
+
+
+def percentile(values, fraction: float) -> float:
+    """Percentil por posição mais próxima (`fraction` entre 0 e 1); 0.0 sem amostras."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = max(0, math.ceil(fraction * len(ordered)) - 1)
+    return ordered[index]
+
+
+def profiled(path: str, fn, *args, **kwargs):
+    """Executa `fn(*args, **kwargs)` sob cProfile e grava as estatísticas (pstats) em `path`.
+
+    Leia depois com `python -m pstats arquivo` ou
+    `pstats.Stats(arquivo).sort_stats("cumulative").print_stats(20)`.
+    """
+    profiler = cProfile.Profile()
+    try:
+        return profiler.runcall(fn, *args, **kwargs)
+    finally:
+        pstats.Stats(profiler).dump_stats(path)
@@ -0,0 +1,137 @@
+"""Tabelas de finais Syzygy (`chess.syzygy`) com cache LRU das sondagens.
+
+As tabelas são opcionais: coloque os arquivos `.rtbw`/`.rtbz` na pasta
+`syzygy/` do projeto (ou indique outra em `open_tablebase`). Na raiz, a
+DTZ escolhe o lance; dentro da busca, a WDL resolve as posições com
+poucas peças sem descer mais na árvore.
+"""
+import os
+from collections import OrderedDict
+
+import chess
+import chess.syzygy
+
+from transposicao import position_key
+
+SYZYGY_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "syzygy")
+SYZYGY_PROBE_LIMIT = 5  # máximo de peças (reis incluídos) para sondar durante a busca
+PROBE_CACHE_SIZE = 65536  # resultados de sondagem guardados no cache LRU
+
+TB_WIN = 50000  # vitória pela tabela; abaixo do mate (100000), acima de qualquer avaliação
+
+_MISSING = object()
+
+
+class Tablebase:
+    """Sondagens WDL/DTZ com um cache LRU limitado na frente do disco.
+
+    Os valores são do ponto de vista do lado a jogar, como em
+    `chess.syzygy`: WDL 2 vitória, 1 vitória anulada pela regra dos 50
+    lances, 0 empate, -1 e -2 o simétrico. Posições sem tabela também são
+    guardadas no cache, para não repetir a procura do arquivo.
+    """
+
+    def __init__(self, directory: str, probe_limit: int = SYZYGY_PROBE_LIMIT, cache_size: int = PROBE_CACHE_SIZE):
+        self.directory = directory
+        self._tables = chess.syzygy.open_tablebase(directory)
+        # Nomes como "KQvK": o número de peças é o tamanho menos o "v"
+        self.max_pieces = max((len(name) - 1 for name in self._tables.wdl), default=0)
+        self.probe_limit = min(probe_limit, self.max_pieces)
+        self.cache_size = cache_size
+        self._cache = OrderedDict()
+        self.probes = 0
+        self.hits = 0
+
+    def close(self):
+        self._tables.close()
+
+    def can_probe(self, board: chess.Board, limit: int = None) -> bool:
+        """A posição tem poucas peças e nenhum roque disponível (as tabelas não cobrem roque)."""
+        if limit is None:
+            limit = self.max_pieces
+        return chess.popcount(board.occupied) <= limit and not board.castling_rights
+
+    def _probe(self, kind: str, board: chess.Board, key: int = None):
+        self.probes += 1
+        cache_key = (kind, position_key(board) if key is None else key)
+        cache = self._cache
+        result = cache.get(cache_key, _MISSING)
+        if result is not _MISSING:
+            self.hits += 1
+            cache.move_to_end(cache_key)
+            return result
+        if kind == "wdl":
+            result = self._tables.get_wdl(board)
+        else:
+            result = self._tables.get_dtz(board)
+        cache[cache_key] = result
+        if len(cache) > self.cache_size:
+            cache.popitem(last=False)
+        return result
+
+    def probe_wdl(self, board: chess.Board, key: int = None):
+        """WDL da posição (lado a jogar) ou None se não houver tabela."""
+        return self._probe("wdl", board, key)
+
+    def probe_dtz(self, board: chess.Board, key: int = None):
+        """DTZ da posição (lado a jogar) ou None se não houver tabela."""
+        return self._probe("dtz", board, key)
+
+    def search_value(self, board: chess.Board, ply: int, key: int = None):
+        """Pontuação da busca (positiva favorece as brancas) ou None fora das tabelas.
+
+        Vitórias anuladas pela regra dos 50 lances contam como empate; as
+        demais são ajustadas pelo ply para preferir o caminho mais curto.
+        """
+        if not self.can_probe(board, self.probe_limit):
+            return None
+        wdl = self.probe_wdl(board, key)
+        if wdl is None:
+            return None
+        if wdl > 1:
+            value = TB_WIN - ply
+        elif wdl < -1:
+            value = -TB_WIN + ply
+        else:
+            value = 0
+        return value if board.turn == chess.WHITE else -value
+
+    def best_move(self, board: chess.Board):
+        """Lance exato pela DTZ na raiz, ou None se a posição não estiver nas tabelas.
+
+        Vence da forma mais rápida até zerar o contador de 50 lances, empata
+        quando não há vitória e, perdendo, adia a derrota ao máximo.
+        """
+        if not self.can_probe(board) or self.probe_wdl(board) is None:
+            return None
+        board = board.copy(stack=False)
+        best_key, best_move = None, None
+        for move in board.legal_moves:
+            board.push(move)
+            try:
+                if board.is_checkmate():
+                    return move
+                wdl = self.probe_wdl(board)
+                dtz = self.probe_dtz(board)
+            finally:
+                board.pop()
+            if wdl is None or dtz is None:
+                return None  # tabela da posição resultante ausente: deixa para a busca
+            # Resultado do adversário após o lance: quanto menor, melhor para nós.
+            # Ganhando (dtz < 0), o dtz mais próximo de zero converte mais rápido;
+            # perdendo (dtz > 0), o maior dtz adia a derrota.
+            rank = (-wdl, dtz)
+            if best_key is None or rank > best_key:
+                best_key, best_move = rank, move
+        return best_move
+
+
+def open_tablebase(directory: str = SYZYGY_PATH, **kwargs):
+    """Abre as tabelas se a pasta existir e contiver alguma; caso contrário devolve None."""
+    if not directory or not os.path.isdir(directory):
+        return None
+    tablebase = Tablebase(directory, **kwargs)
+    if not tablebase.max_pieces:
+        tablebase.close()
+        return None
+    return tablebase
@@ -0,0 +1,112 @@
+"""Livro de aberturas no formato Polyglot (.bin), lido via `mmap`.
+
+O arquivo é uma sequência de entradas de 16 bytes ordenadas pela chave
+Zobrist (chave: 8 bytes, lance: 2, peso: 2, aprendizado: 4, big-endian).
+A sondagem é uma busca binária direto no mapeamento, sem carregar o livro
+na memória.
+"""
+import mmap
+import os
+import random
+import struct
+
+import chess
+
+from transposicao import position_key
+
+BOOK_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "livro.bin")
+BOOK_MAX_DEPTH = 20  # meias-jogadas a partir do início em que o livro é consultado
+BOOK_SELECTION = "weighted"  # "weighted" (sorteio pelo peso) ou "best" (maior peso)
+
+ENTRY = struct.Struct(">QHHI")
+KEY = struct.Struct(">Q")
+
+# Roque no Polyglot é codificado como "rei captura a própria torre"
+_CASTLING = {
+    (chess.E1, chess.H1): chess.G1,
+    (chess.E1, chess.A1): chess.C1,
+    (chess.E8, chess.H8): chess.G8,
+    (chess.E8, chess.A8): chess.C8,
+}
+
+
+def _decode_move(board: chess.Board, bits: int) -> chess.Move:
+    to_square = bits & 63
+    from_square = (bits >> 6) & 63
+    promotion = (bits >> 12) & 7
+    if board.piece_type_at(from_square) == chess.KING:
+        to_square = _CASTLING.get((from_square, to_square), to_square)
+    return chess.Move(from_square, to_square, promotion + 1 if promotion else None)
+
+
+class OpeningBook:
+    """Livro Polyglot somente leitura, mapeado em memória."""
+
+    def __init__(self, path: str, max_depth: int = BOOK_MAX_DEPTH, selection: str = BOOK_SELECTION):
+        if selection not in ("weighted", "best"):
+            raise ValueError(f"seleção de livro desconhecida: {selection!r}")
+        self.path = path
+        self.max_depth = max_depth
+        self.selection = selection
+        self._file = open(path, "rb")
+        size = os.fstat(self._file.fileno()).st_size
+        self.size = size // ENTRY.size
+        # mmap não aceita arquivos vazios
+        self._data = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if self.size else b""
+
+    def close(self):
+        if isinstance(self._data, mmap.mmap):
+            self._data.close()
+        self._file.close()
+
+    def _first_index(self, key: int) -> int:
+        """Índice da primeira entrada com chave >= `key` (busca binária)."""
+        data = self._data
+        low, high = 0, self.size
+        while low < high:
+            middle = (low + high) // 2
+            if KEY.unpack_from(data, middle * ENTRY.size)[0] < key:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def entries(self, board: chess.Board):
+        """Lista de (lance, peso) do livro para a posição, só com lances legais."""
+        key = position_key(board)
+        data = self._data
+        found = []
+        index = self._first_index(key)
+        while index < self.size:
+            entry_key, bits, weight, _ = ENTRY.unpack_from(data, index * ENTRY.size)
+            if entry_key != key:
+                break
+            move = _decode_move(board, bits)
+            if board.is_legal(move):
+                found.append((move, weight))
+            index += 1
+        return found
+
+    def choose(self, board: chess.Board, rng: random.Random = None):
+        """Lance do livro para a posição, ou None (fora do livro ou além de `max_depth`)."""
+        if board.ply() >= self.max_depth:
+            return None
+        found = self.entries(board)
+        if not found:
+            return None
+        total = sum(weight for _, weight in found)
+        if self.selection == "best" or not total:
+            return max(found, key=lambda item: item[1])[0]
+        pick = (rng or random).randrange(total)
+        for move, weight in found:
+            pick -= weight
+            if pick < 0:
+                return move
+        return found[-1][0]
+
+
+def open_book(path: str = BOOK_FILE, **kwargs):
+    """Abre o livro se o arquivo existir; caso contrário devolve None."""
+    if not path or not os.path.exists(path):
+        return None
+    return OpeningBook(path, **kwargs)
@@ -0,0 +1,547 @@
+import math
+
+import chess
+
+from avaliacao import PIECE_VALUES, SearchBoard, mop_up_score
+from controle import SearchControl
+from estatisticas import SearchStats, profiled
+from finais import open_tablebase
+from livro import open_book
+from ordenacao import MAX_PLY, MoveOrderer
+from persistencia import CACHE_HIT_DEPTH, open_cache
+from transposicao import DECISIVE_SCORE, EXACT, LOWER, UPPER, TT_SIZE_MB, TranspositionTable
+
+TIME_LIMIT = 120  # segundos para o motor responder
+WORKERS = 1  # processos da busca paralela (Lazy SMP); 1 = busca na própria thread
+
+# Tabela de transposição compartilhada entre lances (tamanho em MB configurável)
+TT = TranspositionTable(TT_SIZE_MB)
+
+# Killers e histórico (a ordenação aprende ao longo da partida)
+ORDERER = MoveOrderer(PIECE_VALUES)
+
+# Livro de aberturas Polyglot (None se `livro.bin` não existir)
+BOOK = open_book()
+
+# Tabelas de finais Syzygy (None se a pasta `syzygy/` não existir)
+TABLEBASE = open_tablebase()
+
+# Cache persistente de análises, compartilhado entre partidas e processos. Opcional:
+# só é aberto na primeira busca com `use_cache` (ou com `USE_CACHE` ligado)
+USE_CACHE = False
+CACHE = None
+_cache_opened = False
+
+# Versão da avaliação e da busca, gravada no cache de análises. Aumente ao
+# mudar qualquer uma das duas: o arquivo gravado pela versão anterior é descartado.
+ENGINE_VERSION = 2
+
+
+MATE_SCORE = 100000  # mate na raiz; a `ply` meias-jogadas dela vale MATE_SCORE - ply
+
+# Janela de aspiração: meia-largura inicial (centipeões) e a partir de quanto ela abre de vez
+ASPIRATION_WINDOW = 50
+ASPIRATION_LIMIT = 800
+
+# Busca seletiva: cada técnica pode ser desligada para medir sua contribuição
+NULL_MOVE_PRUNING = True
+LATE_MOVE_REDUCTIONS = True
+FUTILITY_PRUNING = True
+REVERSE_FUTILITY_PRUNING = True
+
+NULL_MOVE_MIN_DEPTH = 3
+NULL_MOVE_REDUCTION = 2  # R base do lance nulo; +1 a cada 4 plies de profundidade
+LMR_MIN_DEPTH = 3
+LMR_MIN_MOVES = 3  # lances buscados por inteiro antes de começar a reduzir
+FUTILITY_MARGINS = (0, 200, 500)  # por profundidade restante (1 e 2)
+REVERSE_FUTILITY_DEPTH = 3
+REVERSE_FUTILITY_MARGIN = 120  # por ply de profundidade restante
+
+# Busca de quiescência (só capturas e promoções) nas folhas
+QUIESCENCE_BUDGET = 256  # nós de quiescência permitidos a partir de cada folha
+DELTA_MARGIN = 200  # folga da poda delta (centipeões)
+
+
+def static_score(board: SearchBoard) -> int:
+    """Avaliação estática do ponto de vista do lado a jogar: a incremental mais o bônus contra rei sozinho."""
+    score = board.score + mop_up_score(board)
+    return score if board.turn == chess.WHITE else -score
+
+
+def negamax(
+    board: SearchBoard,
+    depth: int,
+    alpha: float,
+    beta: float,
+    control: SearchControl,
+    tt: TranspositionTable,
+    orderer: MoveOrderer,
+    ply: int,
+):
+    """Negamax com Alpha-Beta e PVS. Pontuação do ponto de vista do lado a jogar.
+
+    O primeiro lance é buscado com a janela completa; os demais, com janela
+    nula, e só são rebuscados se superarem alfa. Fora da variante principal
+    valem as podas seletivas (lance nulo, LMR, futilidade e futilidade
+    reversa), cada uma com seu interruptor. Os lances são gerados uma
+    única vez por nó: lista vazia é mate ou afogamento. Empates por repetição
+    (histórico de chaves do `SearchBoard`), regra dos 50 lances e material
+    insuficiente são testados sem gerar lances.
+
+    Retorna None se o tempo estourar ou a busca for cancelada.
+    """
+
+    # Controle de tempo / cancelamento (o relógio só é consultado a cada N nós)
+    control.nodes += 1
+    if control.nodes >= control.next_check and control.check():
+        return None
+
+    if board.halfmove_clock >= 100 or board.is_repeated() or board.is_insufficient_material():
+        return 0
+
+    if depth == 0:
+        control.quiescence_limit = control.qnodes + QUIESCENCE_BUDGET
+        return quiescence(board, alpha, beta, control, orderer, ply)
+
+    key = board.zobrist_key
+
+    # Poucas peças: o resultado exato vem da tabela de finais
+    if TABLEBASE is not None and ply:
+        value = TABLEBASE.search_value(board, ply, key)
+        if value is not None:
+            return value if board.turn == chess.WHITE else -value
+
+    # Consulta a tabela de transposição
+    entry = tt.probe(key, ply)
+    hash_move = None
+    if entry is not None:
+        hash_move = entry[3]
+        if entry[0] >= depth:
+            _, value, bound, _ = entry
+            if bound == EXACT:
+                return value
+            if bound == LOWER:
+                alpha = max(alpha, value)
+            else:
+                beta = min(beta, value)
+            if beta <= alpha:
+                return value
+
+    in_check = board.is_check()
+    futile = False
+    if ply and not in_check and beta - alpha == 1:
+        static = static_score(board)
+
+        # Futilidade reversa: perto das folhas, muito acima de beta já basta
+        if REVERSE_FUTILITY_PRUNING and depth <= REVERSE_FUTILITY_DEPTH and abs(beta) < DECISIVE_SCORE:
+            margin = REVERSE_FUTILITY_MARGIN * depth
+            if static - margin >= beta:
+                return static - margin
+
+        # Lance nulo: se passar a vez ainda supera beta, o nó é podado. Contra
+        # zugzwang: nunca em xeque, nem dois seguidos, nem só com peões.
+        if (
+            NULL_MOVE_PRUNING
+            and depth >= NULL_MOVE_MIN_DEPTH
+            and static >= beta
+            and board.move_stack[-1]
+            and board.occupied_co[board.turn] & ~(board.pawns | board.kings)
+        ):
+            reduction = NULL_MOVE_REDUCTION + depth // 4
+            board.push(chess.Move.null())
+            value = negamax(board, max(depth - 1 - reduction, 0), -beta, -beta + 1, control, tt, orderer, ply + 1)
+            board.pop()
+            if value is None:
+                return None
+            if -value >= beta:
+                return beta if -value >= DECISIVE_SCORE else -value
+
+        # Futilidade: nem ganhando a margem o lance silencioso chega a alfa
+        futile = (
+            FUTILITY_PRUNING
+            and depth < len(FUTILITY_MARGINS)
+            and abs(alpha) < DECISIVE_SCORE
+            and static + FUTILITY_MARGINS[depth] <= alpha
+        )
+
+    moves = orderer.order_moves(board, ply, hash_move)
+    if not moves:
+        return -MATE_SCORE + ply if in_check else 0  # mate (mais perto é pior) ou afogamento
+
+    alpha_orig = alpha
+    best_value = -math.inf
+    best_move = None
+    reducible = LATE_MOVE_REDUCTIONS and depth >= LMR_MIN_DEPTH and not in_check
+    for index, move in enumerate(moves):
+        quiet = False
+        if index and (futile or (reducible and index >= LMR_MIN_MOVES)):
+            quiet = not (move.promotion or board.is_capture(move))
+            if futile and quiet and not board.gives_check(move):
+                continue
+        board.push(move)
+        if index == 0:
+            value = negamax(board, depth - 1, -beta, -alpha, control, tt, orderer, ply + 1)
+        else:
+            # LMR: lances silenciosos do fim da lista buscados com menos profundidade
+            reduction = 0
+            if reducible and quiet and index >= LMR_MIN_MOVES and not board.is_check():
+                reduction = 2 if depth >= 6 and index >= 3 * LMR_MIN_MOVES else 1
+            # PVS: janela nula para provar que o lance não supera alfa
+            value = negamax(board, depth - 1 - reduction, -alpha - 1, -alpha, control, tt, orderer, ply + 1)
+            if value is not None and reduction and -value > alpha:
+                value = negamax(board, depth - 1, -alpha - 1, -alpha, control, tt, orderer, ply + 1)
+            if value is not None and alpha < -value < beta:
+                value = negamax(board, depth - 1, -beta, -alpha, control, tt, orderer, ply + 1)
+        board.pop()
+        if value is None:
+            return None  # tempo esgotado
+        value = -value
+        if value > best_value:
+            best_value = value
+            best_move = move
+            if value > alpha:
+                alpha = value
+                if alpha >= beta:
+                    orderer.record_cutoff(board, move, depth, ply, index)
+                    break  # poda beta
+
+    # Valores fora da janela original são apenas limites
+    if best_value <= alpha_orig:
+        bound = UPPER
+    elif best_value >= beta:
+        bound = LOWER
+    else:
+        bound = EXACT
+    tt.store(key, depth, best_value, bound, best_move, ply)
+    return best_value
+
+
+def quiescence(
+    board: SearchBoard,
+    alpha: float,
+    beta: float,
+    control: SearchControl,
+    orderer: MoveOrderer,
+    ply: int,
+):
+    """Busca de quiescência: só capturas e promoções até a posição ficar calma.
+
+    O lado a jogar pode parar na avaliação estática (stand pat). Capturas que
+    nem com `DELTA_MARGIN` alcançam alfa (poda delta) ou que perdem material
+    pela SEE não são tentadas. Em xeque, todas as evasões são buscadas. Cada
+    folha do negamax tem um orçamento de `QUIESCENCE_BUDGET` nós; esgotado,
+    vale a avaliação estática. Retorna None se o tempo estourar.
+    """
+
+    control.nodes += 1
+    control.qnodes += 1
+    if control.nodes >= control.next_check and control.check():
+        return None
+
+    static = static_score(board)
+    if control.qnodes >= control.quiescence_limit or ply >= MAX_PLY:
+        control.leaves += 1
+        return static
+
+    in_check = board.is_check()
+    if in_check:
+        moves = orderer.order_moves(board, ply)
+        if not moves:
+            return -MATE_SCORE + ply
+        best_value = -math.inf
+    else:
+        control.leaves += 1
+        if static >= beta:
+            return static
+        best_value = static
+        if static > alpha:
+            alpha = static
+        moves = orderer.order_captures(board)
+
+    values = orderer.piece_values
+    for move in moves:
+        if not in_check:
+            # Poda delta: nem ganhando a peça (e a margem) chega a alfa
+            if board.is_en_passant(move):
+                gain = values[chess.PAWN]
+            else:
+                gain = values.get(board.piece_type_at(move.to_square), 0)
+            if move.promotion:
+                gain += values[move.promotion] - values[chess.PAWN]
+            if static + gain + DELTA_MARGIN <= alpha:
+                continue
+            # SEE: capturas que perdem material não são tentadas
+            if orderer.see(board, move) < 0:
+                continue
+        board.push(move)
+        value = quiescence(board, -beta, -alpha, control, orderer, ply + 1)
+        board.pop()
+        if value is None:
+            return None
+        value = -value
+        if value > best_value:
+            best_value = value
+            if value > alpha:
+                alpha = value
+                if alpha >= beta:
+                    break
+    return best_value
+
+
+def negamax_root(
+    board: SearchBoard,
+    depth: int,
+    alpha: float,
+    beta: float,
+    control: SearchControl,
+    tt: TranspositionTable,
+    orderer: MoveOrderer,
+    pv_move: chess.Move = None,
+):
+    """Camada raiz do negamax: devolve (valor para o lado a jogar, melhor lance).
+
+    `pv_move` (o melhor lance da iteração anterior) é tentado primeiro com a
+    janela (`alpha`, `beta`) e os demais com janela nula (PVS). Um valor
+    <= `alpha` ou >= `beta` é só um limite e pede nova busca com janela maior.
+    """
+
+    best_value = -math.inf
+    best_move = None
+    alpha_orig = alpha
+    completed = True
+    for move in orderer.order_moves(board, 0, pv_move):
+        if control.stopped():
+            completed = False
+            break
+        board.push(move)
+        if best_move is None:
+            value = negamax(board, depth - 1, -beta, -alpha, control, tt, orderer, 1)
+        else:
+            value = negamax(board, depth - 1, -alpha - 1, -alpha, control, tt, orderer, 1)
+            if value is not None and alpha < -value < beta:
+                value = negamax(board, depth - 1, -beta, -alpha, control, tt, orderer, 1)
+        board.pop()
+        if value is None:
+            completed = False
+            break  # Estouro de tempo dentro da busca
+        value = -value
+        if value > best_value:
+            best_value = value
+            best_move = move
+            if value > alpha:
+                alpha = value
+                if alpha >= beta:
+                    break  # falhou acima da janela de aspiração
+    if completed and best_move is not None and alpha_orig < best_value < beta:
+        # Profundidade concluída dentro da janela: o valor da raiz é exato
+        tt.store(board.zobrist_key, depth, best_value, EXACT, best_move)
+    return best_value, best_move
+
+
+def aspiration_search(
+    board: SearchBoard,
+    depth: int,
+    control: SearchControl,
+    tt: TranspositionTable,
+    orderer: MoveOrderer,
+    pv_move: chess.Move = None,
+    previous: int = None,
+):
+    """Busca a raiz numa janela de aspiração em torno de `previous`.
+
+    `previous` é o valor (positivo favorece as brancas) da iteração anterior.
+    Se o resultado cair fora da janela, o lado que falhou é alargado,
+    dobrando a cada tentativa, até virar infinito. Devolve (valor para as
+    brancas, lance); com a busca interrompida, o lance parcial só é aceito se
+    não falhou abaixo da janela.
+    """
+
+    sign = 1 if board.turn == chess.WHITE else -1
+    alpha, beta = -math.inf, math.inf
+    delta = ASPIRATION_WINDOW
+    if previous is not None and abs(previous) < DECISIVE_SCORE:
+        alpha, beta = previous * sign - delta, previous * sign + delta
+
+    while True:
+        value, move = negamax_root(board, depth, alpha, beta, control, tt, orderer, pv_move)
+        if control.aborted or move is None:
+            if move is not None and value > alpha:
+                return value * sign, move
+            return None, None
+        if value <= alpha:
+            alpha = -math.inf if delta >= ASPIRATION_LIMIT else alpha - delta
+        elif value >= beta:
+            beta = math.inf if delta >= ASPIRATION_LIMIT else beta + delta
+            pv_move = move  # o lance que falhou acima abre a nova busca
+        else:
+            return value * sign, move
+        delta *= 2
+
+
+def analysis_cache():
+    """Cache persistente de análises, aberto na primeira chamada (None se não puder ser usado)."""
+    global CACHE, _cache_opened
+    if not _cache_opened:
+        CACHE = open_cache(engine_version=ENGINE_VERSION)
+        _cache_opened = True
+    return CACHE
+
+
+def search_table(workers: int = None):
+    """Tabela de transposição usada pela busca (a compartilhada, no modo Lazy SMP)."""
+    if workers is None:
+        workers = WORKERS
+    if workers > 1:
+        from busca_paralela import get_searcher
+
+        return get_searcher(workers, TT.size_mb).tt
+    return TT
+
+
+def search_best_move(
+    board: chess.Board,
+    time_limit: int = TIME_LIMIT,
+    tt: TranspositionTable = None,
+    orderer: MoveOrderer = None,
+    control: SearchControl = None,
+    on_iteration=None,
+    workers: int = None,
+    max_depth: int = None,
+    use_book: bool = True,
+    stats: SearchStats = None,
+    profile: str = None,
+    use_cache: bool = None,
+):
+    """Iterative Deepening usando negamax (Alpha-Beta + PVS) até esgotar o tempo.
+
+    A tabela de transposição e as heurísticas de ordenação são mantidas entre
+    as profundidades (e entre lances, quando nenhuma é passada, usando as
+    globais `TT` e `ORDERER`). O melhor lance de cada iteração abre a seguinte,
+    e o seu valor centra a janela de aspiração da próxima.
+
+    `control` define o orçamento de tempo (ver `SearchControl.from_clock`),
+    permite cancelar a busca de outra thread e acompanhar os nós visitados;
+    `on_iteration(depth, value, move)` é chamado a cada profundidade concluída.
+
+    Com `workers` > 1 (padrão: `WORKERS`) a busca é feita por processos Lazy
+    SMP com tabela compartilhada, e vale o resultado completo mais profundo;
+    se o grupo não devolver lance, a busca é refeita neste processo. Um lance
+    legal é sempre devolvido quando a posição tem algum.
+    `max_depth` limita a profundidade do aprofundamento iterativo.
+
+    Com `use_book`, um lance do livro de aberturas (`BOOK`) é devolvido na
+    hora e a busca só roda quando a posição não está no livro. Nos finais
+    cobertos pelas tabelas Syzygy (`TABLEBASE`) o lance vem da DTZ.
+
+    `stats` (um `SearchStats`) recebe os contadores a cada profundidade
+    concluída, sem custo por nó; com `profile`, a busca roda sob cProfile e
+    as estatísticas são gravadas nesse arquivo (formato pstats).
+
+    Com `use_cache` (padrão: `USE_CACHE`), o cache persistente é consultado
+    antes da busca: um resultado com profundidade suficiente (`max_depth`,
+    ou `CACHE_HIT_DEPTH` nas buscas por tempo) é devolvido na hora; um mais
+    raso só abre a ordenação da primeira profundidade. O resultado da última
+    profundidade concluída é gravado de volta no cache.
+    """
+
+    if profile:
+        return profiled(
+            profile,
+            search_best_move,
+            board,
+            time_limit,
+            tt=tt,
+            orderer=orderer,
+            control=control,
+            on_iteration=on_iteration,
+            workers=workers,
+            max_depth=max_depth,
+            use_book=use_book,
+            stats=stats,
+            profile=None,
+            use_cache=use_cache,
+        )
+
+    if use_book and BOOK is not None:
+        book_move = BOOK.choose(board)
+        if book_move is not None:
+            return book_move
+    if TABLEBASE is not None:
+        tablebase_move = TABLEBASE.best_move(board)
+        if tablebase_move is not None:
+            return tablebase_move
+
+    # Posições já repetidas dependem do histórico, que a chave não inclui
+    if use_cache is None:
+        use_cache = USE_CACHE
+    cache = analysis_cache() if use_cache and not board.is_repetition(2) else None
+    cached = cache.probe(board) if cache is not None else None
+    if control is None:
+        control = SearchControl(time_limit)
+    if cached is not None and cached[2] >= (max_depth or CACHE_HIT_DEPTH):
+        move, value, depth = cached
+        if stats is not None:
+            stats.record_iteration(depth, value, move, control)
+        if on_iteration is not None:
+            on_iteration(depth, value, move)
+        return move
+
+    if workers is None:
+        workers = WORKERS
+    if workers > 1:
+        from busca_paralela import get_searcher
+
+        searcher = get_searcher(workers, TT.size_mb)  # `TT` define o tamanho também no Lazy SMP
+        move = searcher.search(board, time_limit, max_depth=max_depth, control=control, on_iteration=on_iteration)
+        if move is not None:
+            if stats is not None:
+                stats.update(control)
+                stats.depth = searcher.depth
+            if cache is not None and searcher.depth:
+                cache.store(board, move, searcher.value, searcher.depth)
+            return move
+        # Nenhum processo publicou uma profundidade (grupo quebrado): busca neste processo
+    if tt is None:
+        tt = TT
+    if orderer is None:
+        orderer = ORDERER
+    tt.new_search()
+    tt.reset_stats()
+    orderer.new_search()
+    search_board = SearchBoard.from_board(board)
+    depth = 1
+    best_move = cached[0] if cached is not None else None  # lance do cache abre a primeira profundidade
+    previous = None
+    # Resultado da última profundidade buscada por inteiro (o que vai para o cache)
+    completed_move, completed_value, completed_depth = None, None, 0
+
+    while max_depth is None or depth <= max_depth:
+        # Só inicia a profundidade se ela couber no tempo restante
+        if not control.can_start_iteration():
+            break
+        control.begin_iteration()
+        value, move = aspiration_search(search_board, depth, control, tt, orderer, best_move, previous)
+        if not control.aborted:
+            control.end_iteration()
+        if move is not None:
+            # O lance de uma profundidade interrompida ainda é jogado: a
+            # aspiração só o devolve se ele superou o da profundidade anterior
+            best_move = move
+            previous = value
+            if not control.aborted:  # só profundidades concluídas são publicadas e guardadas
+                completed_move, completed_value, completed_depth = move, value, depth
+                if stats is not None:
+                    stats.record_iteration(depth, value, move, control, orderer, tt)
+                if on_iteration is not None:
+                    on_iteration(depth, value, move)
+        else:
+            break  # tempo esgotado dentro da profundidade atual
+        depth += 1
+    if stats is not None:
+        stats.update(control, orderer, tt)  # inclui os nós da profundidade interrompida
+    if cache is not None and completed_depth:
+        cache.store(board, completed_move, completed_value, completed_depth)
+    if best_move is None:
+        # Sem tempo nem para a primeira profundidade: o primeiro lance da ordenação
+        best_move = next(iter(orderer.order_moves(search_board, 0)), None)
+    return best_move
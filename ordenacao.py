@@ -0,0 +1,162 @@
+import random
+
+import chess
+
+MAX_PLY = 128  # profundidade máxima (em meias-jogadas) da tabela de killers
+
+# Faixas de prioridade: lance da PV/tabela > capturas (MVV-LVA) > killers > histórico
+HASH_MOVE_SCORE = 10_000_000
+CAPTURE_SCORE = 2_000_000
+KILLER_SCORE = 1_000_000
+HISTORY_LIMIT = 500_000  # acima disso o histórico é reduzido à metade
+SEE_KING_VALUE = 20_000  # o rei só entra na troca como último atacante
+
+
+class MoveOrderer:
+    """Ordenação de lances para o Alpha-Beta.
+
+    Guarda dois lances killer por ply e uma tabela de histórico
+    [cor][origem][destino] para os lances silenciosos, além de contadores
+    de podas que mostram a qualidade da ordenação.
+    """
+
+    def __init__(self, piece_values: dict):
+        self.piece_values = piece_values
+        self.history = [[0] * 4096, [0] * 4096]  # índice: origem * 64 + destino
+        self.clear_killers()
+        self.reset_stats()
+
+    def clear_killers(self):
+        self.killers = [[None, None] for _ in range(MAX_PLY)]
+
+    def reset_stats(self):
+        self.cutoffs = 0
+        self.first_move_cutoffs = 0
+
+    def new_search(self):
+        """Prepara uma nova busca: killers descartados e histórico envelhecido."""
+        self.clear_killers()
+        for table in self.history:
+            for i, value in enumerate(table):
+                if value:
+                    table[i] = value >> 1
+        self.reset_stats()
+
+    def perturb_history(self, seed: int, spread: int = 64):
+        """Soma ruído pequeno ao histórico, para que buscas paralelas (Lazy SMP) divirjam."""
+        rng = random.Random(seed)
+        for table in self.history:
+            for i in range(len(table)):
+                table[i] += rng.randrange(spread)
+
+    def capture_score(self, board: chess.Board, move: chess.Move) -> int:
+        """MVV-LVA: vítima mais valiosa primeiro, atacante menos valioso como desempate."""
+        values = self.piece_values
+        if board.is_en_passant(move):
+            victim = values[chess.PAWN]
+        else:
+            victim = values[board.piece_type_at(move.to_square)]
+        attacker = values[board.piece_type_at(move.from_square)]
+        return 10 * victim - attacker
+
+    def see(self, board: chess.Board, move: chess.Move) -> int:
+        """Static exchange evaluation: saldo material da sequência de capturas em
+        `move.to_square`, cada lado capturando com a peça menos valiosa (raios X incluídos,
+        cravadas ignoradas).
+        """
+        values = self.piece_values
+        to_square = move.to_square
+        occupied = board.occupied ^ chess.BB_SQUARES[move.from_square]
+        if board.is_en_passant(move):
+            occupied ^= chess.BB_SQUARES[to_square - 8 if board.turn == chess.WHITE else to_square + 8]
+            gains = [values[chess.PAWN]]
+        else:
+            gains = [values.get(board.piece_type_at(to_square), 0)]
+        if move.promotion:
+            gains[0] += values[move.promotion] - values[chess.PAWN]
+            on_square = values[move.promotion]
+        else:
+            attacker = board.piece_type_at(move.from_square)
+            on_square = SEE_KING_VALUE if attacker == chess.KING else values[attacker]
+
+        side = not board.turn
+        while True:
+            attackers = board.attackers_mask(side, to_square, occupied) & occupied & board.occupied_co[side]
+            if not attackers:
+                break
+            for piece_type in chess.PIECE_TYPES:
+                candidates = attackers & board.pieces_mask(piece_type, side)
+                if candidates:
+                    break
+            square = chess.lsb(candidates)
+            if piece_type == chess.KING and board.attackers_mask(not side, to_square, occupied ^ chess.BB_SQUARES[square]) & occupied & board.occupied_co[not side]:
+                break  # o rei não pode capturar numa casa defendida
+            gains.append(on_square - gains[-1])
+            on_square = SEE_KING_VALUE if piece_type == chess.KING else values[piece_type]
+            occupied ^= chess.BB_SQUARES[square]
+            side = not side
+
+        # Cada lado pode parar de trocar quando quiser
+        for i in range(len(gains) - 1, 0, -1):
+            gains[i - 1] = -max(-gains[i - 1], gains[i])
+        return gains[0]
+
+    def order_captures(self, board: chess.Board):
+        """Capturas e promoções legais em ordem MVV-LVA (para a busca de quiescência)."""
+        values = self.piece_values
+        scored = []
+        for move in board.generate_legal_captures():
+            score = self.capture_score(board, move)
+            if move.promotion:
+                score += values[move.promotion]
+            scored.append((score, move))
+        promotion_rank = chess.BB_RANK_8 if board.turn == chess.WHITE else chess.BB_RANK_1
+        for move in board.generate_legal_moves(board.pawns, promotion_rank & ~board.occupied):
+            if move.promotion == chess.QUEEN:
+                scored.append((10 * values[chess.QUEEN], move))
+        scored.sort(key=lambda item: item[0], reverse=True)
+        return [move for _, move in scored]
+
+    def order_moves(self, board: chess.Board, ply: int, hash_move=None):
+        """Devolve a lista de lances legais na ordem em que devem ser tentados."""
+        killers = self.killers[ply] if ply < MAX_PLY else (None, None)
+        history = self.history[board.turn]
+        values = self.piece_values
+        scored = []
+        for move in board.legal_moves:
+            if move == hash_move:
+                score = HASH_MOVE_SCORE
+            elif board.is_capture(move):
+                score = CAPTURE_SCORE + self.capture_score(board, move)
+                if move.promotion:
+                    score += values[move.promotion]
+            elif move.promotion:
+                score = CAPTURE_SCORE + 10 * values[move.promotion]
+            elif move == killers[0]:
+                score = KILLER_SCORE + 1
+            elif move == killers[1]:
+                score = KILLER_SCORE
+            else:
+                score = history[move.from_square * 64 + move.to_square]
+            scored.append((score, move))
+        scored.sort(key=lambda item: item[0], reverse=True)
+        return [move for _, move in scored]
+
+    def record_cutoff(self, board: chess.Board, move: chess.Move, depth: int, ply: int, move_index: int):
+        """Atualiza killers, histórico e contadores após uma poda causada por `move`."""
+        self.cutoffs += 1
+        if move_index == 0:
+            self.first_move_cutoffs += 1
+        if board.is_capture(move) or move.promotion:
+            return
+        if ply < MAX_PLY:
+            killers = self.killers[ply]
+            if killers[0] != move:
+                killers[1] = killers[0]
+                killers[0] = move
+        table = self.history[board.turn]
+        index = move.from_square * 64 + move.to_square
+        table[index] += depth * depth
+        if table[index] > HISTORY_LIMIT:
+            for i, value in enumerate(table):
+                table[i] = value >> 1
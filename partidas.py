@@ -0,0 +1,304 @@
+"""Partidas entre duas configurações do motor (testes A/B).
+
+Cada abertura é jogada duas vezes, com as cores trocadas, e as partidas
+correm em paralelo num grupo de processos. As partidas são gravadas em PGN
+à medida que terminam; ao fim (ou quando o SPRT decide) são mostrados a
+diferença de Elo com intervalo de 95%, a vazão em partidas/hora e o NPS
+médio de cada lado:
+
+    python xadrez.py match --a time=0.2 --b time=0.2 --b NULL_MOVE_PRUNING=False --pgn ab.pgn
+
+As opções `--a`/`--b` aceitam `time` (segundos por lance), `depth`
+(profundidade máxima) e qualquer constante de `motor.py` (por exemplo
+`ASPIRATION_WINDOW=30` ou `FUTILITY_PRUNING=False`).
+"""
+import argparse
+import ast
+import concurrent.futures
+import math
+import os
+import sys
+import time
+
+import chess
+import chess.pgn
+
+from processos import engine, pool_size, process_pool, search_position
+
+MAX_PLIES = 300  # partidas mais longas são declaradas empatadas
+MATCH_TT_SIZE_MB = 16  # tabela de cada lado, em cada partida
+DEFAULT_CONFIG = {"time": 0.1, "depth": None}
+MIN_VARIANCE = 0.01  # piso da variância por partida no SPRT
+
+# Aberturas equilibradas (posições após poucos lances)
+OPENINGS = [
+    "rnbqkbnr/pppp1ppp/8/4p3/4P3/5N2/PPPP1PPP/RNBQKB1R b KQkq - 1 2",
+    "rnbqkbnr/pp1ppppp/8/2p5/4P3/8/PPPP1PPP/RNBQKBNR w KQkq - 0 2",
+    "rnbqkbnr/pppp1ppp/4p3/8/4P3/8/PPPP1PPP/RNBQKBNR w KQkq - 0 2",
+    "rnbqkbnr/pp1ppppp/2p5/8/4P3/8/PPPP1PPP/RNBQKBNR w KQkq - 0 2",
+    "rnbqkbnr/ppp1pppp/8/3p4/3P4/8/PPP1PPPP/RNBQKBNR w KQkq - 0 2",
+    "rnbqkb1r/pppppppp/5n2/8/3P4/8/PPP1PPPP/RNBQKBNR w KQkq - 1 2",
+    "rnbqkbnr/pppppppp/8/8/2P5/8/PP1PPPPP/RNBQKBNR b KQkq - 0 1",
+    "rnbqkbnr/pppppppp/8/8/8/5N2/PPPPPPPP/RNBQKB1R b KQkq - 1 1",
+    "r1bqkbnr/pppp1ppp/2n5/4p3/4P3/5N2/PPPP1PPP/RNBQKB1R w KQkq - 2 3",
+    "rnbqkb1r/pppp1ppp/4pn2/8/2PP4/8/PP2PPPP/RNBQKBNR w KQkq - 0 3",
+    "rnbqkbnr/ppp2ppp/4p3/3p4/3PP3/8/PPP2PPP/RNBQKBNR w KQkq - 0 3",
+    "rnbqkbnr/pp2pppp/2p5/3p4/2PP4/8/PP2PPPP/RNBQKBNR w KQkq - 0 3",
+]
+
+
+def parse_config(items) -> dict:
+    """Converte ["time=0.2", "NULL_MOVE_PRUNING=False"] em dicionário de configuração."""
+    config = dict(DEFAULT_CONFIG)
+    for item in items or ():
+        key, _, text = item.partition("=")
+        try:
+            value = ast.literal_eval(text)
+        except (ValueError, SyntaxError):
+            value = text
+        config[key.strip()] = value
+    return config
+
+
+def engine_names() -> set:
+    """Nomes definidos no módulo `motor`, lidos do código-fonte.
+
+    O coordenador confere as configurações sem importar o motor (que
+    alocaria a tabela de transposição).
+    """
+    path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "motor.py")
+    with open(path, encoding="utf-8") as file:
+        tree = ast.parse(file.read())
+    names = set()
+    for node in tree.body:
+        if isinstance(node, ast.Assign):
+            names.update(target.id for target in node.targets if isinstance(target, ast.Name))
+        elif isinstance(node, ast.AnnAssign) and isinstance(node.target, ast.Name):
+            names.add(node.target.id)
+        elif isinstance(node, (ast.Import, ast.ImportFrom)):
+            names.update((alias.asname or alias.name).partition(".")[0] for alias in node.names)
+        elif isinstance(node, (ast.FunctionDef, ast.ClassDef)):
+            names.add(node.name)
+    return names
+
+
+def _apply_config(motor, config: dict, defaults: dict):
+    """Ajusta as constantes do motor para a configuração do lado a jogar."""
+    for key, value in defaults.items():
+        setattr(motor, key, value)
+    for key, value in config.items():
+        if key in DEFAULT_CONFIG:
+            continue
+        if not hasattr(motor, key):
+            raise ValueError(f"configuração desconhecida do motor: {key}")
+        setattr(motor, key, value)
+
+
+def play_game(game_id: int, fen: str, a_is_white: bool, config_a: dict, config_b: dict) -> dict:
+    """Executada nos processos do grupo: joga uma partida completa e devolve o resultado."""
+    from avaliacao import PIECE_VALUES
+    from ordenacao import MoveOrderer
+    from transposicao import TranspositionTable
+
+    motor = engine()
+
+    overridable = set(config_a) | set(config_b)
+    defaults = {key: getattr(motor, key) for key in overridable if hasattr(motor, key)}
+    sides = {}
+    for name, config in (("A", config_a), ("B", config_b)):
+        sides[name] = {
+            "config": config,
+            "tt": TranspositionTable(MATCH_TT_SIZE_MB),
+            "orderer": MoveOrderer(PIECE_VALUES),
+            "nodes": 0,
+            "time": 0.0,
+        }
+    white, black = ("A", "B") if a_is_white else ("B", "A")
+
+    board = chess.Board(fen)
+    try:
+        while not board.is_game_over(claim_draw=True) and board.ply() < MAX_PLIES:
+            side = sides[white if board.turn == chess.WHITE else black]
+            config = side["config"]
+            _apply_config(motor, config, defaults)
+            move, stats = search_position(
+                board,
+                config["time"] if config["time"] else math.inf,
+                tt=side["tt"],
+                orderer=side["orderer"],
+                max_depth=config["depth"],
+                use_book=False,
+                use_cache=False,  # o cache misturaria as análises de A e B
+            )
+            side["nodes"] += stats.nodes
+            side["time"] += stats.elapsed
+            if move is None:
+                break
+            board.push(move)
+    finally:
+        _apply_config(motor, {}, defaults)
+
+    outcome = board.outcome(claim_draw=True)
+    result = outcome.result() if outcome else "1/2-1/2"
+    game = chess.pgn.Game.from_board(board)
+    game.headers["Event"] = "Partidas A/B"
+    game.headers["Round"] = str(game_id + 1)
+    game.headers["White"] = white
+    game.headers["Black"] = black
+    game.headers["Result"] = result
+    if outcome is None:
+        game.headers["Termination"] = "adjudication"
+    a_points = {"1-0": 1.0, "0-1": 0.0}.get(result, 0.5)
+    return {
+        "game": game_id,
+        "pgn": str(game),
+        "a_score": a_points if a_is_white else 1.0 - a_points,
+        "nodes": {name: side["nodes"] for name, side in sides.items()},
+        "time": {name: side["time"] for name, side in sides.items()},
+        "plies": board.ply(),
+    }
+
+
+def elo_estimate(wins: int, draws: int, losses: int):
+    """Diferença de Elo (A - B) e meia-largura do intervalo de 95%."""
+    games = wins + draws + losses
+    if not games:
+        return 0.0, math.inf
+    score = (wins + 0.5 * draws) / games
+    variance = (wins * (1 - score) ** 2 + draws * (0.5 - score) ** 2 + losses * score ** 2) / games
+    variance = max(variance, MIN_VARIANCE)  # como no SPRT: placar unânime não tem variância medida
+
+    def to_elo(p):
+        p = min(max(p, 1e-6), 1 - 1e-6)
+        return 400 * math.log10(p / (1 - p))
+
+    margin = 1.96 * math.sqrt(variance / games)
+    return to_elo(score), (to_elo(score + margin) - to_elo(score - margin)) / 2
+
+
+def sprt_llr(wins: int, draws: int, losses: int, elo0: float, elo1: float) -> float:
+    """Razão de log-verossimilhança do SPRT (aproximação normal, Elo logístico)."""
+    games = wins + draws + losses
+    if not games:
+        return 0.0
+    score = (wins + 0.5 * draws) / games
+    variance = (wins * (1 - score) ** 2 + draws * (0.5 - score) ** 2 + losses * score ** 2) / games
+    variance = max(variance, MIN_VARIANCE)  # placar unânime não tem variância medida
+    s0 = 1 / (1 + 10 ** (-elo0 / 400))
+    s1 = 1 / (1 + 10 ** (-elo1 / 400))
+    return games * (s1 - s0) * (2 * score - s0 - s1) / (2 * variance)
+
+
+def run_match(
+    config_a: dict,
+    config_b: dict,
+    openings=OPENINGS,
+    rounds: int = 1,
+    workers: int = None,
+    pgn_path: str = None,
+    elo0: float = 0.0,
+    elo1: float = 10.0,
+    alpha: float = 0.05,
+    beta: float = 0.05,
+):
+    """Joga `rounds` vezes cada abertura com as duas cores e imprime o placar de A contra B."""
+    workers = pool_size(workers)
+    lower, upper = math.log(beta / (1 - alpha)), math.log((1 - beta) / alpha)
+    tasks = [
+        (2 * (r * len(openings) + i) + swap, fen, swap == 0)
+        for r in range(rounds)
+        for i, fen in enumerate(openings)
+        for swap in (0, 1)
+    ]
+    wins = draws = losses = 0
+    nodes = {"A": 0, "B": 0}
+    seconds = {"A": 0.0, "B": 0.0}
+    verdict = None
+    start = time.perf_counter()
+    pgn_file = open(pgn_path, "w", encoding="utf-8") if pgn_path else None
+    try:
+        with process_pool(workers) as pool:
+            futures = [pool.submit(play_game, game_id, fen, a_white, config_a, config_b) for game_id, fen, a_white in tasks]
+            for future in concurrent.futures.as_completed(futures):
+                if future.cancelled():
+                    continue
+                result = future.result()
+                if pgn_file:
+                    pgn_file.write(result["pgn"] + "\n\n")
+                    pgn_file.flush()
+                if result["a_score"] == 1.0:
+                    wins += 1
+                elif result["a_score"] == 0.0:
+                    losses += 1
+                else:
+                    draws += 1
+                for name in nodes:
+                    nodes[name] += result["nodes"][name]
+                    seconds[name] += result["time"][name]
+                elo, margin = elo_estimate(wins, draws, losses)
+                llr = sprt_llr(wins, draws, losses, elo0, elo1)
+                print(
+                    f"{wins + draws + losses:>5}/{len(tasks)}  +{wins} ={draws} -{losses}  "
+                    f"Elo {elo:+.1f} ± {margin:.1f}  LLR {llr:+.2f} [{lower:.2f}, {upper:.2f}]"
+                )
+                if llr >= upper or llr <= lower:
+                    verdict = "H1 aceita (A é melhor)" if llr >= upper else "H0 aceita (A não é melhor)"
+                    for pending in futures:
+                        pending.cancel()
+                    break
+    finally:
+        if pgn_file:
+            pgn_file.close()
+
+    elapsed = time.perf_counter() - start
+    games = wins + draws + losses
+    elo, margin = elo_estimate(wins, draws, losses)
+    print(f"\nA: {config_a}\nB: {config_b}")
+    print(f"Placar de A: +{wins} ={draws} -{losses} em {games} partidas, Elo {elo:+.1f} ± {margin:.1f} (95%)")
+    print(f"SPRT [{elo0}, {elo1}]: {verdict or 'sem decisão'}")
+    print(f"Vazão: {games / elapsed * 3600:.0f} partidas/hora com {workers} processos")
+    for name in nodes:
+        nps = nodes[name] / seconds[name] if seconds[name] else 0.0
+        print(f"NPS médio de {name}: {nps:.0f} nós/s")
+    return wins, draws, losses
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="match", description="Partidas entre duas configurações do motor.")
+    parser.add_argument("--a", action="append", metavar="CHAVE=VALOR", help="configuração do motor A")
+    parser.add_argument("--b", action="append", metavar="CHAVE=VALOR", help="configuração do motor B")
+    parser.add_argument("--openings", help="arquivo EPD com as aberturas (padrão: lista interna)")
+    parser.add_argument("--rounds", type=int, default=1, help="repetições de cada abertura (cada uma com as duas cores)")
+    parser.add_argument("--workers", type=int, help="partidas simultâneas (padrão: uma por CPU)")
+    parser.add_argument("--pgn", help="arquivo PGN de saída")
+    parser.add_argument("--elo0", type=float, default=0.0, help="hipótese nula do SPRT (Elo)")
+    parser.add_argument("--elo1", type=float, default=10.0, help="hipótese alternativa do SPRT (Elo)")
+    args = parser.parse_args(argv)
+    config_a, config_b = parse_config(args.a), parse_config(args.b)
+    known = engine_names()
+    for config in (config_a, config_b):
+        if not config["time"] and not config["depth"]:
+            parser.error("cada motor precisa de time ou depth")
+        unknown = sorted(key for key in config if key not in DEFAULT_CONFIG and key not in known)
+        if unknown:
+            parser.error(f"configuração desconhecida do motor: {', '.join(unknown)}")
+
+    openings = OPENINGS
+    if args.openings:
+        with open(args.openings, encoding="utf-8") as file:
+            openings = [chess.Board.from_epd(line)[0].fen() for line in file if line.strip()]
+    run_match(
+        config_a,
+        config_b,
+        openings,
+        args.rounds,
+        args.workers,
+        args.pgn,
+        args.elo0,
+        args.elo1,
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,262 @@
+"""Cache persistente de análises: chave Zobrist -> (lance, pontuação, profundidade, data).
+
+O arquivo é uma tabela hash de tamanho fixo, lida e escrita via `mmap`:
+um cabeçalho de 16 bytes (com a assinatura do motor que gravou os
+registros; um arquivo de outra versão é descartado ao abrir) seguido de baldes de `BUCKET_SLOTS` registros de
+24 bytes (verificação, dados e data, inteiros de 64 bits little-endian).
+Como na tabela de transposição compartilhada, cada registro guarda
+`chave ^ dados ^ data` no lugar da chave. Assim, vários processos podem
+escrever ao mesmo tempo sem travas: um registro misturado por escritas
+concorrentes não confere na leitura e conta como ausência.
+
+O arquivo nunca cresce. Num balde cheio, sai o registro mais raso e,
+entre os de mesma profundidade, o mais antigo. Para mudar o tamanho ou
+descartar registros velhos, use a compactação (com os motores parados):
+
+    python xadrez.py cache info
+    python xadrez.py cache compact --size-mb 32 --max-age-days 90 --min-depth 4
+"""
+import argparse
+import mmap
+import os
+import struct
+import sys
+import time
+
+import chess
+
+from transposicao import SCORE_OFFSET, _pack_move, _unpack_move, position_key
+
+try:
+    import fcntl  # trava exclusiva da compactação (só em sistemas POSIX)
+except ImportError:
+    fcntl = None
+
+CACHE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "analises.cache")
+CACHE_SIZE_MB = 16  # tamanho do arquivo criado automaticamente
+CACHE_HIT_DEPTH = 8  # profundidade que dispensa a busca quando não há `max_depth`
+BUCKET_SLOTS = 4
+
+HEADER = struct.Struct("<4sHHQ")  # marca, versão do formato, versão do motor, número de baldes
+RECORD = struct.Struct("<QQQ")  # chave ^ dados ^ data, dados, data
+MAGIC = b"XIAC"
+VERSION = 2
+
+
+def _pack(move: chess.Move, score: int, depth: int) -> int:
+    # pontuação (32 bits, deslocada) | lance (16) | profundidade (8)
+    return (score + SCORE_OFFSET) << 24 | _pack_move(move) << 8 | min(depth, 255)
+
+
+def _unpack(data: int):
+    return _unpack_move((data >> 8) & 0xFFFF), (data >> 24) - SCORE_OFFSET, data & 0xFF
+
+
+def create_cache_file(path: str, size_mb: float = CACHE_SIZE_MB, engine_version: int = 0):
+    """Cria um arquivo de cache vazio; não substitui um arquivo que já exista."""
+    bucket_count = max(1, int(size_mb * 1024 * 1024) // (BUCKET_SLOTS * RECORD.size))
+    temporary = f"{path}.{os.getpid()}.tmp"
+    with open(temporary, "wb") as file:
+        file.write(HEADER.pack(MAGIC, VERSION, engine_version, bucket_count))
+        file.truncate(HEADER.size + bucket_count * BUCKET_SLOTS * RECORD.size)
+    try:
+        os.link(temporary, path)  # falha se outro processo criou o arquivo antes
+    except FileExistsError:
+        pass
+    finally:
+        os.remove(temporary)
+
+
+class AnalysisCache:
+    """Cache de análises mapeado em memória, compartilhável entre processos.
+
+    As pontuações são do ponto de vista das brancas, como as de
+    `search_best_move`, e os lances são conferidos na posição antes de
+    serem devolvidos.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, "r+b")
+        self._data = mmap.mmap(self._file.fileno(), 0)
+        magic, version, self.engine_version, self.bucket_count = HEADER.unpack_from(self._data, 0)
+        if magic != MAGIC or version != VERSION:
+            self.close()
+            raise ValueError(f"arquivo de cache inválido: {path}")
+        self.probes = 0
+        self.hits = 0
+        self.stores = 0
+
+    def close(self):
+        self._data.close()
+        self._file.close()
+
+    def _bucket(self, key: int) -> int:
+        return HEADER.size + (key % self.bucket_count) * BUCKET_SLOTS * RECORD.size
+
+    def records(self):
+        """Todos os registros válidos: (chave, dados, data)."""
+        data = self._data
+        for offset in range(HEADER.size, len(data), RECORD.size):
+            check, packed, stamp = RECORD.unpack_from(data, offset)
+            if packed:
+                yield check ^ packed ^ stamp, packed, stamp
+
+    def probe(self, board: chess.Board, key: int = None):
+        """(lance, pontuação, profundidade) da posição, ou None."""
+        self.probes += 1
+        if key is None:
+            key = position_key(board)
+        data = self._data
+        offset = self._bucket(key)
+        for _ in range(BUCKET_SLOTS):
+            check, packed, stamp = RECORD.unpack_from(data, offset)
+            if packed and check ^ packed ^ stamp == key:
+                move, score, depth = _unpack(packed)
+                if move is not None and board.is_legal(move):
+                    self.hits += 1
+                    return move, score, depth
+                return None
+            offset += RECORD.size
+        return None
+
+    def store(self, board: chess.Board, move: chess.Move, score: int, depth: int, key: int = None, stamp: int = None):
+        """Grava o resultado de uma busca; só substitui a mesma posição por uma busca tão ou mais funda."""
+        if key is None:
+            key = position_key(board)
+        self._write(key, _pack(move, score, depth), int(time.time()) if stamp is None else stamp)
+
+    def _write(self, key: int, packed: int, stamp: int) -> bool:
+        data = self._data
+        start = self._bucket(key)
+        victim, victim_rank = None, None
+        offset = start
+        for _ in range(BUCKET_SLOTS):
+            check, old, old_stamp = RECORD.unpack_from(data, offset)
+            if not old:
+                rank = (-1, 0)  # espaço vazio: usado antes de qualquer despejo
+            elif check ^ old ^ old_stamp == key:
+                if old & 0xFF > packed & 0xFF:
+                    return False  # já há uma busca mais funda desta posição
+                victim = offset
+                break
+            else:
+                rank = (old & 0xFF, old_stamp)  # mais raso e, depois, mais antigo sai primeiro
+            if victim_rank is None or rank < victim_rank:
+                victim, victim_rank = offset, rank
+            offset += RECORD.size
+        RECORD.pack_into(data, victim, key ^ packed ^ stamp, packed, stamp)
+        self.stores += 1
+        return True
+
+    def usage(self) -> float:
+        """Fração dos registros ocupados."""
+        return sum(1 for _ in self.records()) / (self.bucket_count * BUCKET_SLOTS)
+
+
+def _header(path: str):
+    with open(path, "rb") as file:
+        raw = file.read(HEADER.size)
+    return HEADER.unpack(raw) if len(raw) == HEADER.size else None
+
+
+def open_cache(path: str = CACHE_FILE, engine_version: int = 0, size_mb: float = CACHE_SIZE_MB):
+    """Abre o cache, criando o arquivo se preciso; devolve None se `path` for vazio ou não puder ser usado.
+
+    Um arquivo gravado por outra versão do motor (ou em outro formato) é
+    trocado por um vazio: as pontuações antigas não valem mais.
+    """
+    if not path:
+        return None
+    try:
+        if os.path.exists(path):
+            header = _header(path)
+            if header is not None and header[0] == MAGIC and header[1:3] != (VERSION, engine_version):
+                temporary = f"{path}.{os.getpid()}.new"
+                create_cache_file(temporary, size_mb, engine_version)
+                os.replace(temporary, path)
+        else:
+            create_cache_file(path, size_mb, engine_version)
+        return AnalysisCache(path)
+    except (OSError, ValueError, struct.error) as error:
+        print(f"Cache de análises desativado: {error}", file=sys.stderr)
+        return None
+
+
+def compact(path: str, size_mb: float = None, max_age_days: float = None, min_depth: int = 0) -> tuple:
+    """Reescreve o cache com outro tamanho, sem registros velhos ou rasos.
+
+    Os registros são regravados do mais fundo para o mais raso (e do mais
+    novo para o mais antigo), então, se o novo arquivo for menor, ficam os
+    mais valiosos. O arquivo é trocado de uma vez no fim (`os.replace`).
+    Devolve (registros lidos, registros mantidos).
+    """
+    with open(f"{path}.lock", "a") as lock:
+        if fcntl is not None:
+            fcntl.flock(lock, fcntl.LOCK_EX)  # uma compactação por vez
+        cache = AnalysisCache(path)
+        try:
+            if size_mb is None:
+                size_mb = os.path.getsize(path) / (1024 * 1024)
+            oldest = time.time() - max_age_days * 86400 if max_age_days is not None else 0
+            records = [
+                record for record in cache.records()
+                if record[2] >= oldest and record[1] & 0xFF >= min_depth
+            ]
+            total = sum(1 for _ in cache.records())
+        finally:
+            cache.close()
+        records.sort(key=lambda record: (record[1] & 0xFF, record[2]), reverse=True)
+
+        temporary = f"{path}.compact"
+        if os.path.exists(temporary):
+            os.remove(temporary)
+        create_cache_file(temporary, size_mb, cache.engine_version)
+        target = AnalysisCache(temporary)
+        kept = 0
+        try:
+            for key, packed, stamp in records:
+                kept += target._write(key, packed, stamp)
+        finally:
+            target.close()
+        os.replace(temporary, path)
+    return total, kept
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="cache", description="Manutenção do cache persistente de análises.")
+    parser.add_argument("command", choices=("info", "compact", "clear"))
+    parser.add_argument("--path", default=CACHE_FILE)
+    parser.add_argument("--size-mb", type=float, help="novo tamanho (compact/clear; padrão: o atual)")
+    parser.add_argument("--max-age-days", type=float, help="descarta registros mais antigos (compact)")
+    parser.add_argument("--min-depth", type=int, default=0, help="descarta registros mais rasos (compact)")
+    args = parser.parse_args(argv)
+
+    if not os.path.exists(args.path):
+        print(f"{args.path} não existe")
+        return 1
+    if args.command == "compact":
+        total, kept = compact(args.path, args.size_mb, args.max_age_days, args.min_depth)
+        print(f"{kept} de {total} registros mantidos")
+    elif args.command == "clear":
+        compact(args.path, args.size_mb, min_depth=256)  # nenhum registro passa do filtro
+        print("cache esvaziado")
+    cache = AnalysisCache(args.path)
+    try:
+        depths = {}
+        for _, packed, _ in cache.records():
+            depths[packed & 0xFF] = depths.get(packed & 0xFF, 0) + 1
+        size = os.path.getsize(args.path) / (1024 * 1024)
+        print(
+            f"{args.path}: {size:.1f} MB, versão do motor {cache.engine_version}, "
+            f"{sum(depths.values())} registros ({cache.usage():.1%} ocupado)"
+        )
+        for depth in sorted(depths):
+            print(f"  profundidade {depth:>3}: {depths[depth]}")
+    finally:
+        cache.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
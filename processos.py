@@ -0,0 +1,42 @@
+"""Grupo de processos compartilhado pela análise em lote, pelas partidas A/B e pelo servidor.
+
+Os processos são criados com `spawn`: não herdam o estado do coordenador
+e cada um importa o motor (e aloca a sua tabela de transposição) só na
+primeira tarefa.
+"""
+import concurrent.futures
+import multiprocessing
+import os
+
+import chess
+
+
+def pool_size(workers: int = None) -> int:
+    """Número de processos do grupo (padrão: um por CPU)."""
+    return workers or os.cpu_count() or 1
+
+
+def process_pool(workers: int = None) -> concurrent.futures.ProcessPoolExecutor:
+    """Grupo de `workers` processos `spawn`."""
+    context = multiprocessing.get_context("spawn")
+    return concurrent.futures.ProcessPoolExecutor(pool_size(workers), mp_context=context)
+
+
+def engine():
+    """O módulo `motor`, para as funções executadas nos processos do grupo.
+
+    Importado aqui, e não no topo dos módulos, para o processo coordenador
+    não alocar a tabela de transposição.
+    """
+    import motor
+
+    return motor
+
+
+def search_position(board: chess.Board, time_limit: float, **kwargs):
+    """Executada nos processos do grupo: busca com um só processo e devolve (lance, `SearchStats`)."""
+    from estatisticas import SearchStats
+
+    stats = SearchStats()
+    move = engine().search_best_move(board, time_limit, workers=1, stats=stats, **kwargs)
+    return move, stats
@@ -0,0 +1,410 @@
+"""Servidor TCP (asyncio) para muitas partidas simultâneas com um só grupo de processos.
+
+Cada conexão pode abrir várias partidas; o estado de cada uma (um
+`chess.Board`) fica no servidor e as buscas vão para um grupo de processos
+compartilhado e limitado:
+
+    python xadrez.py serve --port 8765 --workers 4
+
+Protocolo em linhas de texto (UTF-8), uma resposta por linha, sempre com o
+identificador da partida quando houver:
+
+    new [segundos] [fen]   ->  game <id>
+    move <id> <uci>        ->  moved <id> <uci>
+    go <id>                ->  bestmove <id> <uci> <profundidade> <nós> <ms>
+                               busy <id>          (fila cheia: tente de novo)
+                               over <id> <resultado>
+    fen <id>               ->  fen <id> <fen>
+    close <id>             ->  closed <id>
+    stats                  ->  stats <json>
+    quit                   (encerra a conexão)
+
+Erros respondem `error <id ou -> <mensagem>`. As respostas de `go` chegam
+quando a busca termina, possivelmente depois de respostas a comandos
+seguintes.
+
+A fila faz rodízio entre conexões (um cliente com centenas de partidas não
+atrasa quem tem uma só) e, dentro de cada conexão, entre as suas partidas;
+cada partida tem no máximo uma busca pendente, descartada se ela for
+fechada antes da resposta. O
+limite de tempo de cada partida conta desde a entrada na fila: a busca
+recebe o que sobrou, com um mínimo de `MIN_SEARCH_TIME`. Com a fila cheia
+o servidor responde `busy` na hora, em vez de acumular trabalho.
+"""
+import argparse
+import asyncio
+import collections
+import itertools
+import json
+import sys
+import time
+
+import chess
+
+from estatisticas import percentile
+from processos import pool_size, process_pool, search_position
+
+HOST = "127.0.0.1"
+PORT = 8765
+DEFAULT_MOVE_TIME = 0.5  # segundos por lance quando `new` não informa
+MAX_MOVE_TIME = 10.0  # teto do tempo por lance pedido pelo cliente
+MIN_SEARCH_TIME = 0.02  # busca mínima quando a espera na fila já consumiu o tempo
+QUEUE_LIMIT = 256  # buscas na fila (fora as em andamento) antes de responder busy
+LATENCY_WINDOW = 10000  # amostras de latência guardadas para os percentis
+
+
+def engine_move(fen: str, moves: list, time_limit: float) -> dict:
+    """Executada nos processos do grupo: busca o lance da posição `fen` seguida de `moves`."""
+    board = chess.Board(fen)
+    for uci in moves:
+        board.push_uci(uci)  # histórico completo para detectar repetições
+    move, stats = search_position(board, time_limit)
+    return {"move": move.uci() if move else None, "depth": stats.depth, "nodes": stats.nodes}
+
+
+class FairQueue:
+    """Fila limitada com rodízio: cada `get` atende o próximo cliente com trabalho e, dele, a próxima partida."""
+
+    def __init__(self, limit: int = QUEUE_LIMIT):
+        self.limit = limit
+        self._queues = {}  # cliente -> {partida: deque de tarefas}, partidas na ordem de atendimento
+        self._turns = collections.deque()  # clientes com tarefas, na ordem de atendimento
+        self._waiters = collections.deque()
+        self._size = 0
+
+    def __len__(self):
+        return self._size
+
+    def put(self, client, game_id, item):
+        """Enfileira sem esperar; levanta `asyncio.QueueFull` se a fila estiver no limite."""
+        if self._size >= self.limit:
+            raise asyncio.QueueFull
+        games = self._queues.get(client)
+        if games is None:
+            games = self._queues[client] = {}
+            self._turns.append(client)
+        games.setdefault(game_id, collections.deque()).append(item)
+        self._size += 1
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                break
+
+    async def get(self):
+        while not self._size:
+            waiter = asyncio.get_running_loop().create_future()
+            self._waiters.append(waiter)
+            await waiter
+        client = self._turns.popleft()
+        games = self._queues[client]
+        game_id = next(iter(games))
+        queue = games.pop(game_id)
+        item = queue.popleft()
+        self._size -= 1
+        if queue:
+            games[game_id] = queue  # volta para o fim da vez do cliente
+        if games:
+            self._turns.append(client)
+        else:
+            del self._queues[client]
+        return item
+
+    def discard(self, client, game_id=None) -> list:
+        """Remove e devolve as tarefas pendentes de uma partida ou, sem `game_id`, de todo o cliente."""
+        games = self._queues.get(client)
+        if games is None:
+            return []
+        if game_id is None:
+            removed = [item for queue in games.values() for item in queue]
+            games.clear()
+        else:
+            removed = list(games.pop(game_id, ()))
+        if not games:
+            del self._queues[client]
+            self._turns.remove(client)
+        self._size -= len(removed)
+        return removed
+
+
+class ServerMetrics:
+    """Contadores do servidor e janelas de latência (lance completo e espera na fila)."""
+
+    def __init__(self):
+        self.start_time = time.perf_counter()
+        self.connections = 0
+        self.games = 0
+        self.in_flight = 0
+        self.queue_peak = 0
+        self.completed = 0
+        self.rejected = 0
+        self.nodes = 0
+        self.latencies = collections.deque(maxlen=LATENCY_WINDOW)
+        self.waits = collections.deque(maxlen=LATENCY_WINDOW)
+
+    def record(self, latency: float, wait: float, nodes: int):
+        self.completed += 1
+        self.nodes += nodes
+        self.latencies.append(latency)
+        self.waits.append(wait)
+
+    def snapshot(self, queued: int, workers: int) -> dict:
+        def milliseconds(values):
+            return {
+                "p50": round(percentile(values, 0.50) * 1000, 1),
+                "p90": round(percentile(values, 0.90) * 1000, 1),
+                "p99": round(percentile(values, 0.99) * 1000, 1),
+                "max": round(max(values, default=0.0) * 1000, 1),
+            }
+
+        elapsed = time.perf_counter() - self.start_time
+        return {
+            "uptime": round(elapsed, 1),
+            "connections": self.connections,
+            "games": self.games,
+            "workers": workers,
+            "in_flight": self.in_flight,
+            "queued": queued,
+            "queue_peak": self.queue_peak,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "moves_per_second": round(self.completed / elapsed, 2) if elapsed else 0.0,
+            "nodes": self.nodes,
+            "latency_ms": milliseconds(self.latencies),
+            "wait_ms": milliseconds(self.waits),
+        }
+
+
+class Game:
+    """Partida mantida pelo servidor."""
+
+    def __init__(self, game_id: int, board: chess.Board, move_time: float):
+        self.id = game_id
+        self.board = board
+        self.move_time = move_time
+        self.pending = False  # há uma busca na fila ou em andamento
+        self.search = None  # tarefa do último `go`, cancelada se a partida for fechada
+
+
+class SearchJob:
+    """Pedido de busca na fila: posição congelada no momento do `go`."""
+
+    def __init__(self, game: Game):
+        self.game = game
+        self.fen = game.board.root().fen()
+        self.moves = [move.uci() for move in game.board.move_stack]
+        self.enqueued = time.perf_counter()
+        self.future = asyncio.get_running_loop().create_future()
+
+
+class GameServer:
+    """Partidas por conexão, fila justa e `workers` despachantes, um por processo do grupo."""
+
+    def __init__(self, workers: int = None, queue_limit: int = QUEUE_LIMIT):
+        self.workers = pool_size(workers)
+        self.queue = FairQueue(queue_limit)
+        self.metrics = ServerMetrics()
+        self.games = {}
+        self._ids = itertools.count(1)
+        self.pool = None
+        self._dispatchers = []
+
+    async def start(self, host: str = HOST, port: int = PORT):
+        self.pool = process_pool(self.workers)
+        # Um despachante por processo: o grupo nunca tem trabalho acumulado e a ordem fica com a fila justa
+        self._dispatchers = [asyncio.create_task(self._dispatch()) for _ in range(self.workers)]
+        return await asyncio.start_server(self._handle_connection, host, port)
+
+    def close(self):
+        for task in self._dispatchers:
+            task.cancel()
+        if self.pool is not None:
+            self.pool.shutdown(wait=False, cancel_futures=True)
+
+    def stats(self) -> dict:
+        return self.metrics.snapshot(len(self.queue), self.workers)
+
+    async def _dispatch(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            job = await self.queue.get()
+            if job.future.done():
+                continue  # pedido cancelado enquanto esperava
+            wait = time.perf_counter() - job.enqueued
+            budget = max(MIN_SEARCH_TIME, job.game.move_time - wait)
+            self.metrics.in_flight += 1
+            try:
+                result = await loop.run_in_executor(self.pool, engine_move, job.fen, job.moves, budget)
+            except Exception as error:
+                if not job.future.done():
+                    job.future.set_exception(error)
+            else:
+                result["wait"] = wait
+                if not job.future.done():
+                    job.future.set_result(result)
+            finally:
+                self.metrics.in_flight -= 1
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        client = object()  # identidade da conexão na fila justa
+        owned = {}
+        searches = set()
+        self.metrics.connections += 1
+
+        async def send(line: str):
+            writer.write((line + "\n").encode())
+            await writer.drain()  # respeita o cliente lento (contrapressão do TCP)
+
+        try:
+            while True:
+                raw = await reader.readline()
+                if not raw:
+                    break
+                words = raw.decode("utf-8", "replace").split()
+                if not words:
+                    continue
+                command, args = words[0].lower(), words[1:]
+                if command == "quit":
+                    break
+                if command == "stats":
+                    await send("stats " + json.dumps(self.stats()))
+                    continue
+                if command == "new":
+                    await send(self._new_game(args, owned))
+                    continue
+                if command not in ("move", "go", "fen", "close"):
+                    await send(f"error - comando desconhecido: {command}")
+                    continue
+                game = owned.get(int(args[0])) if args and args[0].isdigit() else None
+                if game is None:
+                    await send(f"error {args[0] if args else '-'} partida inexistente")
+                    continue
+                if command == "fen":
+                    await send(f"fen {game.id} {game.board.fen()}")
+                elif command == "close":
+                    for job in self.queue.discard(client, game.id):
+                        job.future.cancel()
+                    if game.search is not None:
+                        game.search.cancel()  # a resposta de uma busca em andamento é descartada
+                    del owned[game.id]
+                    del self.games[game.id]
+                    self.metrics.games -= 1
+                    await send(f"closed {game.id}")
+                elif game.pending:
+                    await send(f"error {game.id} busca em andamento")
+                elif command == "move":
+                    await send(self._play(game, args[1:]))
+                else:
+                    game.pending = True
+                    task = game.search = asyncio.create_task(self._search(client, game, send))
+                    searches.add(task)
+                    task.add_done_callback(searches.discard)
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            for job in self.queue.discard(client):
+                job.future.cancel()
+            for task in list(searches):
+                task.cancel()
+            for game_id in owned:
+                self.games.pop(game_id, None)
+            self.metrics.games -= len(owned)
+            self.metrics.connections -= 1
+            writer.close()
+
+    def _new_game(self, args: list, owned: dict) -> str:
+        move_time = DEFAULT_MOVE_TIME
+        if args:
+            try:
+                move_time = float(args[0])
+                args = args[1:]
+            except ValueError:
+                pass  # sem tempo: o resto é a FEN
+        try:
+            board = chess.Board(" ".join(args)) if args else chess.Board()
+        except ValueError:
+            return "error - FEN inválida"
+        game = Game(next(self._ids), board, min(max(move_time, MIN_SEARCH_TIME), MAX_MOVE_TIME))
+        owned[game.id] = self.games[game.id] = game
+        self.metrics.games += 1
+        return f"game {game.id}"
+
+    @staticmethod
+    def _play(game: Game, args: list) -> str:
+        try:
+            move = game.board.parse_uci(args[0])
+        except (IndexError, ValueError):
+            return f"error {game.id} lance ilegal"
+        game.board.push(move)
+        return f"moved {game.id} {move.uci()}"
+
+    async def _search(self, client, game: Game, send):
+        """Tarefa de um `go`: a partida já está marcada como pendente pelo leitor da conexão."""
+        try:
+            if game.board.is_game_over(claim_draw=True):
+                await send(f"over {game.id} {game.board.result(claim_draw=True)}")
+                return
+            job = SearchJob(game)
+            try:
+                self.queue.put(client, game.id, job)
+            except asyncio.QueueFull:
+                self.metrics.rejected += 1
+                await send(f"busy {game.id}")
+                return
+            self.metrics.queue_peak = max(self.metrics.queue_peak, len(self.queue))
+            try:
+                result = await job.future
+            except Exception as error:
+                await send(f"error {game.id} falha na busca: {error}")
+                return
+            latency = time.perf_counter() - job.enqueued
+            self.metrics.record(latency, result["wait"], result["nodes"])
+            if result["move"] is None:
+                await send(f"over {game.id} {game.board.result(claim_draw=True)}")
+                return
+            game.board.push_uci(result["move"])
+            await send(f"bestmove {game.id} {result['move']} {result['depth']} {result['nodes']} {latency * 1000:.0f}")
+        except ConnectionError:
+            pass  # cliente desconectou antes da resposta
+        finally:
+            game.pending = False
+
+
+async def serve(host: str, port: int, workers: int = None, queue_limit: int = QUEUE_LIMIT, report: float = None):
+    """Atende até ser interrompido; com `report`, imprime as métricas a cada `report` segundos."""
+    game_server = GameServer(workers, queue_limit)
+    server = await game_server.start(host, port)
+    print(f"Servidor em {host}:{port} com {game_server.workers} processos", file=sys.stderr)
+
+    async def print_reports():
+        while True:
+            await asyncio.sleep(report)
+            print(json.dumps(game_server.stats()), file=sys.stderr)
+
+    reporter = asyncio.create_task(print_reports()) if report else None
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        if reporter is not None:
+            reporter.cancel()
+        game_server.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="serve", description="Servidor TCP de partidas simultâneas.")
+    parser.add_argument("--host", default=HOST)
+    parser.add_argument("--port", type=int, default=PORT)
+    parser.add_argument("--workers", type=int, help="processos de busca (padrão: um por CPU)")
+    parser.add_argument("--queue-limit", type=int, default=QUEUE_LIMIT, help="buscas na fila antes de responder busy")
+    parser.add_argument("--report", type=float, help="imprime as métricas a cada N segundos")
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(serve(args.host, args.port, args.workers, args.queue_limit, args.report))
+    except KeyboardInterrupt:
+        print("\nServidor encerrado.", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,116 @@
+import math
+import threading
+
+import chess
+
+from controle import SearchControl
+from estatisticas import SearchStats
+from transposicao import principal_variation
+
+
+class SearchWorker:
+    """Executa `search_best_move` numa thread sobre uma cópia do tabuleiro.
+
+    O laço principal consulta `done`/`result` sem bloquear e pode ler o
+    progresso publicado a cada iteração (`depth`, `value`, `best_move`), a
+    contagem de nós ao vivo (`nodes`) e o resumo da busca (`stats`). `cancel` pede a parada da busca.
+
+    Para pensar no tempo do adversário, crie o trabalhador com
+    `time_limit=math.inf` sobre a posição prevista e chame `ponderhit`
+    quando o lance previsto for jogado.
+
+    Um `control` próprio (por exemplo `SearchControl.from_clock`) substitui o
+    limite simples de `time_limit`; `on_iteration` é repassado à busca e os
+    demais argumentos nomeados (`max_depth`, `use_book`...) também.
+    """
+
+    def __init__(
+        self,
+        search_fn,
+        board: chess.Board,
+        time_limit: float,
+        ponder_move: chess.Move = None,
+        control: SearchControl = None,
+        on_iteration=None,
+        **search_kwargs,
+    ):
+        self.search_fn = search_fn
+        self.ponder_move = ponder_move  # lance do adversário previsto (modo ponder)
+        self.board = board.copy()
+        self.time_limit = time_limit
+        self.stop_event = threading.Event()
+        if control is None:
+            control = SearchControl(time_limit, self.stop_event)
+        else:
+            control.stop_event = self.stop_event
+        self.control = control
+        self.on_iteration = on_iteration
+        self.search_kwargs = search_kwargs
+        self.stats = SearchStats()
+        self.depth = 0
+        self.value = None
+        self.best_move = None
+        self.result = None
+        self.done = False
+        self._thread = threading.Thread(target=self._run, name="busca-ia", daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def _run(self):
+        try:
+            self.result = self.search_fn(
+                self.board,
+                self.time_limit,
+                control=self.control,
+                on_iteration=self._on_iteration,
+                stats=self.stats,
+                **self.search_kwargs,
+            )
+        finally:
+            self.done = True
+
+    def _on_iteration(self, depth, value, move):
+        self.depth = depth
+        self.value = value
+        self.best_move = move
+        if self.on_iteration is not None:
+            self.on_iteration(depth, value, move)
+
+    @property
+    def nodes(self) -> int:
+        return self.control.nodes
+
+    def ponderhit(self, time_limit: float):
+        """O lance previsto foi jogado: a busca continua, com o tempo já gasto contando no limite."""
+        self.time_limit = time_limit
+        self.control.set_time_limit(time_limit)
+
+    def wait(self):
+        """Bloqueia até a busca terminar e devolve o lance encontrado."""
+        self._thread.join()
+        return self.result
+
+    def cancel(self, wait: bool = True):
+        """Solicita a parada da busca e, opcionalmente, espera a thread terminar."""
+        self.stop_event.set()
+        if wait and self._thread.is_alive():
+            self._thread.join()
+
+
+def start_ponder(search_fn, board: chess.Board, tt) -> SearchWorker:
+    """Prevê a resposta do adversário pela variante principal e começa a pensar nela.
+
+    Devolve o trabalhador (sem limite de tempo) ou None se não houver previsão.
+    Em caso de erro de previsão basta cancelá-lo: a tabela de transposição e o
+    histórico continuam aquecidos para a busca seguinte.
+    """
+    pv = principal_variation(board, tt, 1)
+    if not pv:
+        return None
+    ponder_board = board.copy()
+    ponder_board.push(pv[0])
+    if ponder_board.is_game_over():
+        return None
+    return SearchWorker(search_fn, ponder_board, math.inf, ponder_move=pv[0]).start()
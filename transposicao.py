@@ -0,0 +1,314 @@
+from multiprocessing import shared_memory
+
+import chess
+import chess.polyglot
+
+TT_SIZE_MB = 64  # tamanho padrão da tabela de transposição
+
+# Tipos de limite armazenados em cada entrada
+EXACT = 0  # valor exato (alfa < valor < beta)
+LOWER = 1  # limite inferior (houve poda beta – valor >= beta)
+UPPER = 2  # limite superior (nenhum lance superou alfa – valor <= alfa)
+
+# Acima disso o valor é de mate ou de tabela de finais e carrega a distância
+# até a raiz; na tabela ele é guardado relativo ao nó (ver `_to_tt`).
+DECISIVE_SCORE = 10000
+
+# Estimativa de memória por entrada: chave (int), tupla com quatro campos e
+# as duas referências nas listas internas.
+ENTRY_BYTES = 128
+
+
+# Números aleatórios Polyglot separados por parte da chave, para a
+# atualização incremental: PIECE_KEYS[cor][tipo][casa]
+_RANDOM = chess.polyglot.POLYGLOT_RANDOM_ARRAY
+_HASHER = chess.polyglot.ZobristHasher(_RANDOM)
+PIECE_KEYS = {
+    color: [[0] * 64] + [
+        [_RANDOM[64 * ((piece_type - 1) * 2 + color) + square] for square in chess.SQUARES]
+        for piece_type in chess.PIECE_TYPES
+    ]
+    for color in chess.COLORS
+}
+_CASTLING_KEYS = [
+    (chess.BB_H1, _RANDOM[768]),
+    (chess.BB_A1, _RANDOM[769]),
+    (chess.BB_H8, _RANDOM[770]),
+    (chess.BB_A8, _RANDOM[771]),
+]
+
+
+def position_key(board: chess.Board) -> int:
+    """Chave Zobrist (Polyglot) da posição; O(1) em tabuleiros que a mantêm (`SearchBoard`)."""
+    key = getattr(board, "zobrist_key", None)
+    if key is None:
+        return chess.polyglot.zobrist_hash(board)
+    return key
+
+
+def pieces_key(board: chess.BaseBoard) -> int:
+    """Parte da chave que vem das peças, calculada do zero."""
+    return _HASHER.hash_board(board)
+
+
+def state_key(board: chess.Board) -> int:
+    """Parte da chave que não vem das peças: direitos de roque, en passant e vez."""
+    key = _RANDOM[780] if board.turn == chess.WHITE else 0
+    if board.castling_rights:
+        if board.chess960:
+            key ^= _HASHER.hash_castling(board)
+        else:
+            rights = board.clean_castling_rights()
+            for mask, value in _CASTLING_KEYS:
+                if rights & mask:
+                    key ^= value
+    if board.ep_square is not None:
+        key ^= _HASHER.hash_ep_square(board)
+    return key
+
+
+def _to_tt(value, ply: int):
+    """Valor de mate visto da raiz -> visto do nó, para valer em qualquer caminho até a posição."""
+    if value >= DECISIVE_SCORE:
+        return value + ply
+    if value <= -DECISIVE_SCORE:
+        return value - ply
+    return value
+
+
+def _from_tt(value, ply: int):
+    """Inverso de `_to_tt`: valor de mate da tabela -> visto da raiz, a `ply` meias-jogadas dela."""
+    if value >= DECISIVE_SCORE:
+        return value - ply
+    if value <= -DECISIVE_SCORE:
+        return value + ply
+    return value
+
+
+def principal_variation(board: chess.Board, tt: "TranspositionTable", max_length: int = 16):
+    """Reconstrói a variante principal seguindo os melhores lances da tabela."""
+    board = board.copy()
+    pv = []
+    seen = set()
+    while len(pv) < max_length:
+        key = position_key(board)
+        entry = tt.probe(key)
+        if entry is None or key in seen:
+            break
+        move = entry[3]
+        if move is None or not board.is_legal(move):
+            break
+        seen.add(key)
+        pv.append(move)
+        board.push(move)
+    return pv
+
+
+class TranspositionTable:
+    """Tabela de transposição com baldes de duas entradas.
+
+    Cada balde tem um espaço "preferência por profundidade", substituído apenas
+    por buscas tão ou mais profundas (ou vindas de uma busca anterior), e um
+    espaço "sempre substitui", que recebe tudo o que não couber no primeiro.
+    As pontuações são guardadas do ponto de vista do lado a jogar (negamax);
+    a chave já distingue quem joga. `ply` é a distância do nó até a raiz,
+    usada para guardar os valores de mate relativos ao nó.
+    """
+
+    def __init__(self, size_mb: float = TT_SIZE_MB):
+        self.size_mb = size_mb
+        self.bucket_count = max(1, int(size_mb * 1024 * 1024) // (2 * ENTRY_BYTES))
+        self.clear()
+
+    def clear(self):
+        """Esvazia a tabela e zera as estatísticas."""
+        slots = 2 * self.bucket_count
+        self._keys = [None] * slots
+        self._entries = [None] * slots  # (profundidade, valor, limite, lance, geração)
+        self.generation = 0
+        self.used = 0
+        self.reset_stats()
+
+    def reset_stats(self):
+        self.probes = 0
+        self.hits = 0
+        self.stores = 0
+
+    def new_search(self):
+        """Marca o início de uma nova busca; entradas antigas passam a ser substituíveis."""
+        self.generation = (self.generation + 1) & 0xFF
+
+    def probe(self, key: int, ply: int = 0):
+        """Devolve (profundidade, valor, limite, lance) da posição ou None."""
+        self.probes += 1
+        index = (key % self.bucket_count) * 2
+        keys = self._keys
+        if keys[index] == key:
+            entry = self._entries[index]
+        elif keys[index + 1] == key:
+            entry = self._entries[index + 1]
+        else:
+            return None
+        self.hits += 1
+        return entry[0], _from_tt(entry[1], ply), entry[2], entry[3]
+
+    def store(self, key: int, depth: int, value, bound: int, move, ply: int = 0):
+        """Grava uma entrada usando a política profundidade/sempre-substitui."""
+        self.stores += 1
+        index = (key % self.bucket_count) * 2
+        keys = self._keys
+        entries = self._entries
+        value = _to_tt(value, ply)
+        entry = (depth, value, bound, move, self.generation)
+
+        if keys[index] is None:
+            self.used += 1
+        else:
+            old = entries[index]
+            same = keys[index] == key
+            if not same and old[0] > depth and old[4] == self.generation:
+                # Espaço profundo ocupado por busca mais cara: usa o outro
+                if keys[index + 1] is None:
+                    self.used += 1
+                keys[index + 1] = key
+                entries[index + 1] = entry
+                return
+            if same and move is None:
+                entry = (depth, value, bound, old[3], self.generation)
+        keys[index] = key
+        entries[index] = entry
+        # Evita duplicar a mesma posição nos dois espaços do balde
+        if keys[index + 1] == key:
+            keys[index + 1] = None
+            entries[index + 1] = None
+            self.used -= 1
+
+    def hashfull(self) -> int:
+        """Ocupação da tabela em permilagem."""
+        return self.used * 1000 // (2 * self.bucket_count)
+
+
+# Empacotamento de uma entrada em 64 bits para a tabela compartilhada:
+# valor (32 bits, deslocado) | lance (16) | profundidade (8) | limite (2) | geração (6)
+SCORE_OFFSET = 1 << 31
+MOVE_PRESENT = 1 << 15
+SLOT_BYTES = 16  # verificação (chave ^ dados) + dados, dois inteiros de 64 bits
+
+
+def _pack_move(move) -> int:
+    if move is None:
+        return 0
+    return MOVE_PRESENT | (move.promotion or 0) << 12 | move.from_square << 6 | move.to_square
+
+
+def _unpack_move(bits: int):
+    if not bits & MOVE_PRESENT:
+        return None
+    return chess.Move((bits >> 6) & 63, bits & 63, ((bits >> 12) & 7) or None)
+
+
+class SharedTranspositionTable:
+    """Tabela de transposição em memória compartilhada entre processos (Lazy SMP).
+
+    Mesma interface e política de baldes de `TranspositionTable`, mas cada
+    entrada é empacotada em dois inteiros de 64 bits num bloco
+    `multiprocessing.shared_memory`. Não há travas: cada espaço guarda
+    `chave ^ dados`, de modo que escritas concorrentes entrelaçadas são
+    detectadas na sondagem e tratadas como ausência. As estatísticas de
+    sondagem são locais a cada processo.
+    """
+
+    def __init__(self, size_mb: float = TT_SIZE_MB, name: str = None):
+        self.size_mb = size_mb
+        self.bucket_count = max(1, int(size_mb * 1024 * 1024) // (2 * SLOT_BYTES))
+        size = 2 * self.bucket_count * SLOT_BYTES
+        self.owner = name is None
+        if self.owner:
+            self._shm = shared_memory.SharedMemory(create=True, size=size)
+        else:
+            # Processos filhos compartilham o rastreador de recursos do criador,
+            # que continua sendo o único responsável por remover o bloco.
+            self._shm = shared_memory.SharedMemory(name=name)
+        self.name = self._shm.name
+        self._slots = self._shm.buf.cast("Q")
+        self.generation = 0
+        self.reset_stats()
+
+    @classmethod
+    def attach(cls, size_mb: float, name: str) -> "SharedTranspositionTable":
+        """Abre, em outro processo, uma tabela criada com o mesmo tamanho."""
+        return cls(size_mb, name=name)
+
+    def close(self):
+        """Libera o mapeamento; o processo criador também remove o bloco."""
+        self._slots.release()
+        self._shm.close()
+        if self.owner:
+            self._shm.unlink()
+
+    def clear(self):
+        buf = self._shm.buf
+        buf[:] = bytes(len(buf))  # uma cópia só, em vez de um laço por espaço
+        self.generation = 0
+        self.reset_stats()
+
+    def reset_stats(self):
+        self.probes = 0
+        self.hits = 0
+        self.stores = 0
+
+    def new_search(self):
+        self.generation = (self.generation + 1) & 0x3F
+
+    def probe(self, key: int, ply: int = 0):
+        self.probes += 1
+        slots = self._slots
+        base = (key % self.bucket_count) * 4
+        for offset in (base, base + 2):
+            data = slots[offset + 1]
+            if data and slots[offset] ^ data == key:
+                self.hits += 1
+                return (
+                    (data >> 48) & 0xFF,
+                    _from_tt((data & 0xFFFFFFFF) - SCORE_OFFSET, ply),
+                    (data >> 56) & 3,
+                    _unpack_move((data >> 32) & 0xFFFF),
+                )
+        return None
+
+    def store(self, key: int, depth: int, value, bound: int, move, ply: int = 0):
+        self.stores += 1
+        slots = self._slots
+        base = (key % self.bucket_count) * 4
+        move_bits = _pack_move(move)
+
+        old = slots[base + 1]
+        offset = base
+        if old:
+            same = slots[base] ^ old == key
+            if not same and (old >> 48) & 0xFF > depth and (old >> 58) == self.generation:
+                offset = base + 2  # espaço profundo ocupado por busca mais cara
+            elif same and not move_bits:
+                move_bits = (old >> 32) & 0xFFFF
+
+        data = (
+            (int(_to_tt(value, ply)) + SCORE_OFFSET) & 0xFFFFFFFF
+            | move_bits << 32
+            | min(depth, 255) << 48
+            | bound << 56
+            | self.generation << 58
+        )
+        slots[offset] = key ^ data
+        slots[offset + 1] = data
+        if offset == base:
+            other = slots[base + 3]
+            if other and slots[base + 2] ^ other == key:
+                slots[base + 2] = 0
+                slots[base + 3] = 0
+
+    def hashfull(self) -> int:
+        """Ocupação estimada em permilagem, amostrando os primeiros 1000 espaços."""
+        slots = self._slots
+        sample = min(1000, 2 * self.bucket_count)
+        used = sum(1 for i in range(sample) if slots[2 * i + 1])
+        return used * 1000 // sample
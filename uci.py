@@ -0,0 +1,211 @@
+"""Modo UCI: permite usar o motor em interfaces gráficas e gerenciadores de torneio.
+
+    python xadrez.py uci
+
+A entrada padrão é lida na thread principal e a busca roda num
+`SearchWorker`, então `stop`, `isready` e `quit` são atendidos durante a
+busca. Ao fim de cada profundidade sai uma linha `info` com profundidade,
+pontuação, nós, NPS, ocupação da tabela e variante principal. Comandos de
+`go` aceitos: wtime/btime/winc/binc/movestogo, movetime, depth, nodes e
+infinite.
+"""
+import math
+import sys
+import threading
+
+import chess
+
+import motor
+from controle import SearchControl
+from ordenacao import MAX_PLY
+from trabalhador import SearchWorker
+from transposicao import TranspositionTable, principal_variation
+
+ENGINE_NAME = "Xadrez-IAC"
+ENGINE_AUTHOR = "Felipe Abdullah"
+PV_LENGTH = 16  # máximo de lances da variante principal em cada `info` (nunca além da profundidade)
+
+
+class UciEngine:
+    """Estado de uma sessão UCI: posição atual e a busca em andamento."""
+
+    def __init__(self, output=sys.stdout):
+        self.output = output
+        self.board = chess.Board()
+        self.worker = None
+        self.use_book = True
+        self.use_cache = False  # cache persistente só com a opção PersistentCache
+        self._lock = threading.Lock()  # linhas da thread de busca e da principal não se misturam
+
+    def send(self, line: str):
+        with self._lock:
+            self.output.write(line + "\n")
+            self.output.flush()
+
+    def handle(self, line: str) -> bool:
+        """Processa um comando; devolve False quando a sessão deve terminar."""
+        words = line.split()
+        if not words:
+            return True
+        command, args = words[0], words[1:]
+        if command == "uci":
+            self.send(f"id name {ENGINE_NAME}")
+            self.send(f"id author {ENGINE_AUTHOR}")
+            self.send(f"option name Hash type spin default {motor.TT.size_mb:g} min 1 max 4096")
+            self.send(f"option name Threads type spin default {motor.WORKERS} min 1 max 64")
+            self.send("option name OwnBook type check default true")
+            self.send("option name PersistentCache type check default false")
+            self.send("uciok")
+        elif command == "isready":
+            self.send("readyok")
+        elif command == "setoption":
+            self.stop()
+            self.set_option(args)
+        elif command == "ucinewgame":
+            self.stop()
+            motor.search_table().clear()
+            self.board = chess.Board()
+        elif command == "position":
+            self.stop()
+            self.set_position(args)
+        elif command == "go":
+            self.stop()
+            self.go(args)
+        elif command == "stop":
+            self.stop()
+        elif command == "quit":
+            self.stop()
+            return False
+        return True
+
+    def set_option(self, args: list):
+        text = " ".join(args)
+        name, _, value = text.partition(" value ")
+        name = name.removeprefix("name ").strip().lower()
+        value = value.strip()
+        try:
+            if name == "hash":
+                # No Lazy SMP a tabela compartilhada é recriada com este tamanho na próxima busca
+                motor.TT = TranspositionTable(max(1, int(value)))
+            elif name == "threads":
+                motor.WORKERS = max(1, int(value))
+            elif name == "ownbook":
+                self.use_book = value.lower() == "true"
+            elif name == "persistentcache":
+                self.use_cache = value.lower() == "true"
+        except ValueError:
+            self.send(f"info string valor inválido para {name}: {value}")
+
+    def set_position(self, args: list):
+        """`position startpos|fen <FEN> [moves ...]`."""
+        moves = []
+        if "moves" in args:
+            index = args.index("moves")
+            args, moves = args[:index], args[index + 1:]
+        try:
+            if args[:1] == ["fen"]:
+                board = chess.Board(" ".join(args[1:]))
+            else:
+                board = chess.Board()
+            for uci in moves:
+                board.push_uci(uci)
+        except ValueError as error:
+            self.send(f"info string posição inválida: {error}")
+            return
+        self.board = board
+
+    def go(self, args: list):
+        options = {}
+        infinite = False
+        words = iter(args)
+        for word in words:
+            if word == "infinite":
+                infinite = True
+            elif word in ("wtime", "btime", "winc", "binc", "movestogo", "movetime", "depth", "nodes"):
+                value = next(words, "")
+                try:
+                    options[word] = int(value)
+                except ValueError:
+                    self.send(f"info string valor inválido para {word}: {value}")
+
+        white = self.board.turn == chess.WHITE
+        remaining = options.get("wtime" if white else "btime")
+        node_limit = options.get("nodes")
+        if infinite:
+            control = SearchControl(math.inf, node_limit=node_limit)
+        elif "movetime" in options:
+            control = SearchControl(options["movetime"] / 1000, node_limit=node_limit)
+        elif remaining is not None:
+            increment = options.get("winc" if white else "binc", 0)
+            control = SearchControl.from_clock(
+                remaining / 1000, increment / 1000, options.get("movestogo"), node_limit=node_limit
+            )
+        else:
+            control = SearchControl(math.inf, node_limit=node_limit)  # só depth/nodes, ou nada
+
+        self.worker = SearchWorker(
+            lambda *a, **kw: self._search(infinite, *a, **kw),
+            self.board,
+            control.time_limit,
+            control=control,
+            on_iteration=self._info,
+            max_depth=options.get("depth"),
+            use_book=self.use_book,
+            use_cache=self.use_cache,
+        )
+        self.worker.start()  # só depois de atribuído: a busca pode terminar na hora (livro)
+
+    def _search(self, infinite: bool, board, time_limit, **kwargs):
+        """Roda na thread do trabalhador: busca e responde `bestmove`."""
+        move = None
+        try:
+            move = motor.search_best_move(board, time_limit, **kwargs)
+        finally:
+            if infinite:
+                self.worker.stop_event.wait()  # em `go infinite` o lance só sai depois do `stop`
+            if move is None:
+                move = self.worker.best_move or next(iter(board.legal_moves), None)
+            self.send(f"bestmove {move.uci() if move else '0000'}")
+        return move
+
+    def _info(self, depth: int, value, move):
+        """Linha `info` de uma profundidade concluída (chamada na thread de busca)."""
+        worker = self.worker
+        control = worker.control
+        elapsed = control.elapsed()
+        nodes = control.nodes
+        tt = motor.search_table()
+        pv = principal_variation(worker.board, tt, min(depth, PV_LENGTH)) or [move]
+        if pv[0] != move:
+            pv = [move]
+        if worker.board.turn == chess.BLACK:
+            value = -value  # o UCI usa o ponto de vista do lado a jogar
+        if abs(value) >= motor.MATE_SCORE - MAX_PLY:
+            # O valor de mate é MATE_SCORE menos a distância em meias-jogadas
+            moves = (motor.MATE_SCORE - abs(value) + 1) // 2
+            score = f"mate {moves if value > 0 else -moves}"
+        else:
+            score = f"cp {value}"
+        self.send(
+            f"info depth {depth} score {score} nodes {nodes} nps {int(nodes / elapsed) if elapsed else 0} "
+            f"time {int(elapsed * 1000)} hashfull {tt.hashfull()} pv {' '.join(m.uci() for m in pv)}"
+        )
+
+    def stop(self):
+        """Interrompe a busca em andamento; o `bestmove` sai antes de voltar."""
+        if self.worker is not None:
+            self.worker.cancel()
+            self.worker = None
+
+
+def main(argv=None):
+    engine = UciEngine()
+    for line in sys.stdin:
+        if not engine.handle(line):
+            break
+    engine.stop()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,127 +1,15 @@
 import chess
 import random
 import time
-import math
 import sys
 
-TIME_LIMIT = 120  # segundos para o motor responder
+from estatisticas import SearchStats
+from motor import TIME_LIMIT, search_best_move, search_table
+from trabalhador import start_ponder
 
-# Valores de peça simplificados
-PIECE_VALUES = {
-    chess.PAWN: 100,
-    chess.KNIGHT: 320,
-    chess.BISHOP: 330,
-    chess.ROOK: 500,
-    chess.QUEEN: 900,
-    chess.KING: 0,
-}
-
-
-def evaluate(board: chess.Board) -> int:
-    """Avaliação simples baseada apenas em material. Pontuação positiva favorece as brancas."""
-
-    # Condições terminais
-    if board.is_checkmate():
-        # O lado a jogar está em xeque-mate – logo, posição é perdida para ele.
-        return -100000 if board.turn else 100000
-    if board.is_stalemate() or board.is_insufficient_material():
-        return 0
-
-    score = 0
-    for piece_type, value in PIECE_VALUES.items():
-        score += len(board.pieces(piece_type, chess.WHITE)) * value
-        score -= len(board.pieces(piece_type, chess.BLACK)) * value
-    return score
-
-
-def alphabeta(
-    board: chess.Board,
-    depth: int,
-    alpha: float,
-    beta: float,
-    maximizing: bool,
-    start_time: float,
-    time_limit: int,
-):
-    """Alpha-Beta recursivo. Retorna None se o tempo estourar."""
-
-    # Controle de tempo
-    if time.time() - start_time >= time_limit:
-        return None
-
-    if depth == 0 or board.is_game_over():
-        return evaluate(board)
-
-    if maximizing:
-        max_eval = -math.inf
-        for move in board.legal_moves:
-            board.push(move)
-            eval_ = alphabeta(board, depth - 1, alpha, beta, False, start_time, time_limit)
-            board.pop()
-            if eval_ is None:
-                return None  # tempo esgotado
-            max_eval = max(max_eval, eval_)
-            alpha = max(alpha, eval_)
-            if beta <= alpha:
-                break  # poda beta
-        return max_eval
-    else:
-        min_eval = math.inf
-        for move in board.legal_moves:
-            board.push(move)
-            eval_ = alphabeta(board, depth - 1, alpha, beta, True, start_time, time_limit)
-            board.pop()
-            if eval_ is None:
-                return None
-            min_eval = min(min_eval, eval_)
-            beta = min(beta, eval_)
-            if beta <= alpha:
-                break  # poda alfa
-        return min_eval
-
-
-def alphabeta_root(board: chess.Board, depth: int, start_time: float, time_limit: int):
-    """Camada raiz do Alpha-Beta que devolve também o melhor lance encontrado."""
-
-    maximizing = board.turn  # True se brancas a jogar
-    best_move = None
-    best_value = -math.inf if maximizing else math.inf
-
-    for move in board.legal_moves:
-        if time.time() - start_time >= time_limit:
-            break
-        board.push(move)
-        value = alphabeta(board, depth - 1, -math.inf, math.inf, not maximizing, start_time, time_limit)
-        board.pop()
-        if value is None:
-            break  # Estouro de tempo dentro da busca
-        if maximizing and value > best_value:
-            best_value = value
-            best_move = move
-        elif not maximizing and value < best_value:
-            best_value = value
-            best_move = move
-    return best_value, best_move
-
-
-def search_best_move(board: chess.Board, time_limit: int = TIME_LIMIT):
-    """Iterative Deepening usando Alpha-Beta até esgotar o tempo."""
-
-    start_time = time.time()
-    depth = 1
-    best_move = None
-
-    while True:
-        # Verifica tempo restante
-        if time.time() - start_time >= time_limit:
-            break
-        value, move = alphabeta_root(board, depth, start_time, time_limit)
-        if move is not None:
-            best_move = move
-        else:
-            break  # tempo esgotado dentro da profundidade atual
-        depth += 1
-    return best_move
+PONDER = True  # pensa durante a vez do adversário
+SHOW_STATS = True  # mostra nós, podas e tempo por profundidade após cada lance da IA
+PROFILE = None  # prefixo dos arquivos .pstats (um por busca); definido por --profile
 
 
 def ask_move(board: chess.Board) -> chess.Move:
@@ -155,13 +43,23 @@ def main():
     print("=== Jogo de Xadrez (IA − Alfa-Beta) ===")
     print(f"O sistema jogará com as {'brancas' if system_color else 'pretas'}.")
     print(board)
+    ponder = None  # busca em segundo plano sobre a resposta prevista do adversário
 
     while not board.is_game_over():
         # Vez da IA
         if board.turn == system_color:
             print("\nSistema pensando…")
             start = time.time()
-            move = search_best_move(board, TIME_LIMIT)
+            if ponder is not None:
+                # Acerto do ponder: a busca continua, com o tempo já pensado contando
+                ponder.ponderhit(TIME_LIMIT)
+                move = ponder.wait()
+                stats = ponder.stats
+                ponder = None
+            else:
+                stats = SearchStats()
+                profile = f"{PROFILE}-{board.ply()}.pstats" if PROFILE else None
+                move = search_best_move(board, TIME_LIMIT, stats=stats, profile=profile)
             elapsed = time.time() - start
 
             if move is None:
@@ -174,9 +72,19 @@ def main():
             san = board.san(move)
             board.push(move)
             print(f"Sistema joga: {san} (tempo: {elapsed:.1f}s)")
+            if SHOW_STATS:
+                print(f"  {stats.summary()}")
+                for line in stats.iteration_lines():
+                    print(line)
             print(board)
+            # O cProfile só enxerga a própria thread: sem ponder enquanto perfila
+            if PONDER and not PROFILE and not board.is_game_over():
+                ponder = start_ponder(search_best_move, board, search_table())
         else:  # Vez do adversário (usuário)
             move = ask_move(board)
+            if ponder is not None and move != ponder.ponder_move:
+                ponder.cancel()  # previsão errada: descarta a busca, mantém as tabelas
+                ponder = None
             board.push(move)
             print(board)
 
@@ -196,6 +104,36 @@ def main():
 
 
 if __name__ == "__main__":
+    if sys.argv[1:2] == ["bench"]:
+        from desempenho import main as bench_main
+
+        sys.exit(bench_main(sys.argv[2:]))
+    if sys.argv[1:2] == ["analyze"]:
+        from analise import main as analyze_main
+
+        sys.exit(analyze_main(sys.argv[2:]))
+    if sys.argv[1:2] == ["match"]:
+        from partidas import main as match_main
+
+        sys.exit(match_main(sys.argv[2:]))
+    if sys.argv[1:2] == ["serve"]:
+        from servidor import main as serve_main
+
+        sys.exit(serve_main(sys.argv[2:]))
+    if sys.argv[1:2] == ["loadtest"]:
+        from carga import main as loadtest_main
+
+        sys.exit(loadtest_main(sys.argv[2:]))
+    if sys.argv[1:2] == ["uci"]:
+        from uci import main as uci_main
+
+        sys.exit(uci_main(sys.argv[2:]))
+    if sys.argv[1:2] == ["cache"]:
+        from persistencia import main as cache_main
+
+        sys.exit(cache_main(sys.argv[2:]))
+    if sys.argv[1:2] == ["--profile"] and len(sys.argv) > 2:
+        PROFILE = sys.argv[2]
     try:
         main()
     except KeyboardInterrupt:
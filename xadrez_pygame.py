@@ -1,17 +1,31 @@
-import pygame
 import chess
 import time
-import math
 import sys
 import random
+from collections import OrderedDict
+
+from motor import search_best_move, search_table
+from trabalhador import SearchWorker, start_ponder
+
+pygame = None  # importado por init_pygame() apenas quando a interface é aberta
+render_cache = None  # RenderCache criado por init_pygame()
 
 # Configurações do jogo
 WIDTH, HEIGHT = 600, 600
 MOVE_LOG_PANEL_WIDTH = 250
 MOVE_LOG_PANEL_HEIGHT = HEIGHT
+MOVE_LOG_TOP = 120  # y da primeira linha de lances (abaixo das peças capturadas)
+MOVE_LOG_LINE_HEIGHT = 20
+MOVE_LOG_VISIBLE_LINES = (MOVE_LOG_PANEL_HEIGHT - MOVE_LOG_TOP) // MOVE_LOG_LINE_HEIGHT
+MOVE_LOG_SCROLL_STEP = 3  # linhas por passo da roda do mouse
+PROMOTION_CHOICES = [chess.QUEEN, chess.KNIGHT, chess.ROOK, chess.BISHOP]  # ordem mostrada ao promover
+MOVE_LOG_AREA = (WIDTH, 0, MOVE_LOG_PANEL_WIDTH, MOVE_LOG_PANEL_HEIGHT)
+STATUS_AREA = (0, HEIGHT - 30, WIDTH + MOVE_LOG_PANEL_WIDTH, 30)  # linha de status (sobre o tabuleiro)
 DIMENSION = 8
 SQ_SIZE = HEIGHT // DIMENSION
 MAX_FPS = 60
+AI_CLOCK_INTERVAL = 100  # ms entre atualizações do relógio "IA pensando"
+MAX_DIRTY_RECTS = 16  # acima disso as regiões sujas são unidas num só retângulo
 WHITE = (255, 255, 255)
 BLACK = (0, 0, 0)
 LIGHT_SQUARE = (240, 217, 181)
@@ -20,19 +34,12 @@ HIGHLIGHT = (247, 247, 105, 128)  # Amarelo com transparência
 BUTTON_COLOR = (100, 100, 200)
 YELLOW = (255, 255, 0)
 TIME_LIMIT = 10  # limite de tempo para IA pensar (segundos)
+TIME_GRACE = 1  # tolerância para a thread de busca devolver o lance após o limite
+PONDER = True  # IA pensa durante a vez do jogador
 
-# Profundidade máxima da busca para evitar travamentos
-MAX_DEPTH = 4
-
-# Valores de peça simplificados
-PIECE_VALUES = {
-    chess.PAWN: 100,
-    chess.KNIGHT: 320,
-    chess.BISHOP: 330,
-    chess.ROOK: 500,
-    chess.QUEEN: 900,
-    chess.KING: 0,
-}
+# Profundidade máxima da busca (o tempo é controlado por TIME_LIMIT; com as
+# podas seletivas a profundidade 4 vinha quase instantânea)
+MAX_DEPTH = 8
 
 # Unicode para peças
 UNICODE_PIECE = {
@@ -40,11 +47,19 @@ UNICODE_PIECE = {
     'p': '♟', 'r': '♜', 'n': '♞', 'b': '♝', 'q': '♛', 'k': '♚'
 }
 
-# Inicialização do Pygame
-pygame.init()
-font = pygame.font.SysFont('Arial', 32)
-small_font = pygame.font.SysFont('Arial', 16)
-button_font = pygame.font.SysFont('Arial', 24)
+def init_pygame():
+    """Importa e inicializa o Pygame e cria as fontes.
+
+    Fica fora do nível do módulo para que processos sem interface (trabalhadores
+    da busca paralela, benchmarks) não carreguem o SDL.
+    """
+    global pygame, font, small_font, button_font, render_cache
+    import pygame
+    pygame.init()
+    font = pygame.font.SysFont('Arial', 32)
+    small_font = pygame.font.SysFont('Arial', 16)
+    button_font = pygame.font.SysFont('Arial', 24)
+    render_cache = RenderCache(SQ_SIZE)
 
 def draw_text_button(screen, text, x, y, width, height, color, text_color):
     """Desenha um botão com texto centralizado."""
@@ -89,6 +104,92 @@ def select_color():
         pygame.display.flip()
         pygame.time.Clock().tick(60)
 
+class RenderCache:
+    """Superfícies e fontes reaproveitadas entre quadros.
+
+    Guarda as fontes já criadas, os 12 sprites de peça (com contorno) por
+    tamanho de casa, o tabuleiro pré-desenhado, as sobreposições de destaque
+    e um cache limitado de textos renderizados.
+    """
+
+    TEXT_CACHE_SIZE = 256
+
+    def __init__(self, sq_size):
+        self.sq_size = sq_size
+        self._fonts = {}
+        self._sprites = {}
+        self._texts = OrderedDict()
+        self._board_surface = None
+        self.selected_overlay = self._overlay('blue')
+        self.move_overlay = self._overlay('green')
+
+    @property
+    def board_surface(self):
+        """Tabuleiro pré-desenhado (criado no primeiro uso, já com a tela aberta)."""
+        if self._board_surface is None:
+            self._board_surface = self._render_board().convert()
+        return self._board_surface
+
+    def font(self, name, size, bold=False):
+        key = (name, size, bold)
+        font = self._fonts.get(key)
+        if font is None:
+            font = self._fonts[key] = pygame.font.SysFont(name, size, bold, False)
+        return font
+
+    def text(self, font, text, color, antialias=True):
+        """Renderiza `text` com uma fonte de `font()`, reaproveitando resultados recentes."""
+        key = (font, text, tuple(color), antialias)
+        surface = self._texts.get(key)
+        if surface is None:
+            surface = self._texts[key] = font.render(text, antialias, color)
+            if len(self._texts) > self.TEXT_CACHE_SIZE:
+                self._texts.popitem(last=False)
+        else:
+            self._texts.move_to_end(key)
+        return surface
+
+    def piece_sprites(self, sq_size=None):
+        """Sprites das 12 peças, com contorno, para o tamanho de casa dado."""
+        sq_size = sq_size or self.sq_size
+        sprites = self._sprites.get(sq_size)
+        if sprites is None:
+            font = self.font("DejaVu Sans", int(sq_size * 0.8))
+            sprites = self._sprites[sq_size] = {
+                symbol: self._render_piece(font, symbol) for symbol in UNICODE_PIECE
+            }
+        return sprites
+
+    def _render_piece(self, font, symbol):
+        glyph = UNICODE_PIECE[symbol]
+        main_color = WHITE if symbol.isupper() else BLACK
+        outline_color = BLACK if symbol.isupper() else WHITE
+        main_text = font.render(glyph, True, main_color)
+        outline_text = font.render(glyph, True, outline_color)
+        width, height = main_text.get_size()
+        sprite = pygame.Surface((width + 2, height + 2), pygame.SRCALPHA)
+
+        # Contorno: o glifo deslocado um pixel em cada diagonal
+        for dx, dy in [(-1, -1), (1, -1), (-1, 1), (1, 1)]:
+            sprite.blit(outline_text, (1 + dx, 1 + dy))
+        sprite.blit(main_text, (1, 1))
+        return sprite.convert_alpha()
+
+    def _render_board(self):
+        surface = pygame.Surface((DIMENSION * self.sq_size, DIMENSION * self.sq_size))
+        colors = [pygame.Color("white"), pygame.Color("gray")]
+        for row in range(DIMENSION):
+            for col in range(DIMENSION):
+                color = colors[(row + col) % 2]
+                pygame.draw.rect(surface, color, pygame.Rect(col * self.sq_size, row * self.sq_size, self.sq_size, self.sq_size))
+        return surface
+
+    def _overlay(self, color):
+        surface = pygame.Surface((self.sq_size, self.sq_size))
+        surface.set_alpha(100)  # transparência
+        surface.fill(pygame.Color(color))
+        return surface
+
 def draw_game_state(screen, board, valid_moves=None, sq_selected=None):
     """Responsável por todo o desenho gráfico do estado atual do jogo."""
     draw_board(screen)  # desenha os quadrados
@@ -96,97 +197,80 @@ def draw_game_state(screen, board, valid_moves=None, sq_selected=None):
     draw_pieces(screen, board)  # desenha as peças no tabuleiro
 
 def draw_board(screen):
-    """Desenha o tabuleiro."""
-    colors = [pygame.Color("white"), pygame.Color("gray")]
-    for row in range(DIMENSION):
-        for col in range(DIMENSION):
-            color = colors[(row + col) % 2]
-            pygame.draw.rect(screen, color, pygame.Rect(col * SQ_SIZE, row * SQ_SIZE, SQ_SIZE, SQ_SIZE))
+    """Desenha o tabuleiro (superfície pré-renderizada)."""
+    screen.blit(render_cache.board_surface, (0, 0))
 
 def highlight_squares(screen, board, valid_moves, sq_selected):
     """Destaca o quadrado selecionado e movimentos válidos."""
     if sq_selected is not None:
         row, col = sq_selected
         # Destaca o quadrado selecionado
-        s = pygame.Surface((SQ_SIZE, SQ_SIZE))
-        s.set_alpha(100)  # transparência
-        s.fill(pygame.Color('blue'))
-        screen.blit(s, (col * SQ_SIZE, row * SQ_SIZE))
+        screen.blit(render_cache.selected_overlay, (col * SQ_SIZE, row * SQ_SIZE))
         
         # Destaca movimentos válidos
         if valid_moves:
             for move in valid_moves:
                 end_row = 7 - (move.to_square // 8)
                 end_col = move.to_square % 8
-                s.fill(pygame.Color('green'))
-                screen.blit(s, (end_col * SQ_SIZE, end_row * SQ_SIZE))
+                screen.blit(render_cache.move_overlay, (end_col * SQ_SIZE, end_row * SQ_SIZE))
 
 def draw_pieces(screen, board):
-    """Desenha as peças usando símbolos Unicode."""
-    font_size = int(SQ_SIZE * 0.8)
-    font = pygame.font.SysFont("DejaVu Sans", font_size)
-
-    for row in range(DIMENSION):
-        for col in range(DIMENSION):
-            square = chess.square(col, 7 - row)
-            piece = board.piece_at(square)
-            if piece:
-                symbol = piece.symbol()
-                glyph = UNICODE_PIECE[symbol]
-                main_color = WHITE if symbol.isupper() else BLACK
-                outline_color = BLACK if symbol.isupper() else WHITE
-                center_x = col * SQ_SIZE + SQ_SIZE // 2
-                center_y = row * SQ_SIZE + SQ_SIZE // 2
-
-                # Desenha o contorno (renderiza em várias posições offset)
-                offsets = [(-1, -1), (1, -1), (-1, 1), (1, 1)]
-                for dx, dy in offsets:
-                    outline_text = font.render(glyph, True, outline_color)
-                    outline_rect = outline_text.get_rect(center=(center_x + dx, center_y + dy))
-                    screen.blit(outline_text, outline_rect)
-
-                # Desenha a peça principal
-                main_text = font.render(glyph, True, main_color)
-                main_rect = main_text.get_rect(center=(center_x, center_y))
-                screen.blit(main_text, main_rect)
-
-def draw_move_log(screen, move_log, captured_white, captured_black):
-    """Desenha painel de histórico e peças capturadas."""
-    font = pygame.font.SysFont("Arial", 14, True, False)
+    """Desenha as peças usando os sprites Unicode do cache."""
+    sprites = render_cache.piece_sprites(SQ_SIZE)
+    for square, piece in board.piece_map().items():
+        row = 7 - chess.square_rank(square)
+        col = chess.square_file(square)
+        sprite = sprites[piece.symbol()]
+        center = (col * SQ_SIZE + SQ_SIZE // 2, row * SQ_SIZE + SQ_SIZE // 2)
+        screen.blit(sprite, sprite.get_rect(center=center))
+
+def scroll_move_log(scroll, total, amount):
+    """Desloca a janela visível do histórico; None volta a acompanhar o último lance."""
+    last_first = max(0, total - MOVE_LOG_VISIBLE_LINES)
+    first = last_first if scroll is None else scroll
+    first = min(max(first + amount, 0), last_first)
+    return None if first >= last_first else first
+
+def draw_move_log(screen, san_log, captured_white, captured_black, scroll=None):
+    """Desenha painel de histórico e peças capturadas.
+
+    `san_log` traz a notação SAN já calculada no momento de cada lance; só as
+    linhas visíveis são desenhadas, a partir de `scroll` (None acompanha o fim).
+    """
+    font = render_cache.font("Arial", 14, True)
     move_log_rect = pygame.Rect(WIDTH, 0, MOVE_LOG_PANEL_WIDTH, MOVE_LOG_PANEL_HEIGHT)
     pygame.draw.rect(screen, pygame.Color("black"), move_log_rect)
 
-    temp_board = chess.Board()
     x, y = WIDTH + 5, 5
-    cap_font = pygame.font.SysFont("DejaVu Sans", 24)
+    cap_font = render_cache.font("DejaVu Sans", 24)
 
     # Peças capturadas de White (ou seja, peças brancas fora do tabuleiro)
-    text = font.render("Capturadas (Brancas):", True, WHITE)
+    text = render_cache.text(font, "Capturadas (Brancas):", WHITE)
     screen.blit(text, (x, y))
     y += 20
-    cap_text = cap_font.render("".join(UNICODE_PIECE[p] for p in captured_white), True, WHITE)
+    cap_text = render_cache.text(cap_font, "".join(UNICODE_PIECE[p] for p in captured_white), WHITE)
     screen.blit(cap_text, (x, y))
 
     y += 35
-    text = font.render("Capturadas (Pretas):", True, WHITE)
+    text = render_cache.text(font, "Capturadas (Pretas):", WHITE)
     screen.blit(text, (x, y))
     y += 20
-    cap_text = cap_font.render("".join(UNICODE_PIECE[p] for p in captured_black), True, WHITE)
+    cap_text = render_cache.text(cap_font, "".join(UNICODE_PIECE[p] for p in captured_black), WHITE)
     screen.blit(cap_text, (x, y))
 
-    y += 40
-    for i, move in enumerate(move_log):
+    y = MOVE_LOG_TOP
+    first = scroll if scroll is not None else max(0, len(san_log) - MOVE_LOG_VISIBLE_LINES)
+    for line, i in enumerate(range(first, min(first + MOVE_LOG_VISIBLE_LINES, len(san_log)))):
         move_text = f"{(i//2)+1}. " if i % 2 == 0 else ""
-        move_text += temp_board.san(move)
-        temp_board.push(move)
+        move_text += san_log[i]
 
-        text = font.render(move_text, True, pygame.Color("white"))
-        screen.blit(text, (x, y + i * 20))
+        text = render_cache.text(font, move_text, WHITE)
+        screen.blit(text, (x, y + line * MOVE_LOG_LINE_HEIGHT))
 
 def draw_end_game_text(screen, text):
     """Desenha a mensagem de fim de jogo na tela."""
-    font = pygame.font.SysFont("Arial", 32, True, False)
-    text_object = font.render(text, False, pygame.Color("white"))
+    font = render_cache.font("Arial", 32, True)
+    text_object = render_cache.text(font, text, WHITE, antialias=False)
     text_location = pygame.Rect(0, 0, WIDTH, HEIGHT).move(
         WIDTH//2 - text_object.get_width()//2, 
         HEIGHT//2 - text_object.get_height()//2
@@ -194,113 +278,14 @@ def draw_end_game_text(screen, text):
     screen.blit(text_object, text_location)
     
     # Adiciona instrução para reiniciar
-    restart_font = pygame.font.SysFont("Arial", 16, True, False)
-    restart_text = restart_font.render("Pressione R para reiniciar o jogo", False, pygame.Color("white"))
+    restart_font = render_cache.font("Arial", 16, True)
+    restart_text = render_cache.text(restart_font, "Pressione R para reiniciar o jogo", WHITE, antialias=False)
     restart_location = text_location.move(0, text_object.get_height() + 10)
     screen.blit(restart_text, restart_location)
 
-def evaluate(board: chess.Board) -> int:
-    """Avaliação simples baseada apenas em material. Pontuação positiva favorece as brancas."""
-
-    # Condições terminais
-    if board.is_checkmate():
-        # O lado a jogar está em xeque-mate – logo, posição é perdida para ele.
-        return -100000 if board.turn else 100000
-    if board.is_stalemate() or board.is_insufficient_material():
-        return 0
-
-    score = 0
-    for piece_type, value in PIECE_VALUES.items():
-        score += len(board.pieces(piece_type, chess.WHITE)) * value
-        score -= len(board.pieces(piece_type, chess.BLACK)) * value
-    return score
-
-def alphabeta(
-    board: chess.Board,
-    depth: int,
-    alpha: float,
-    beta: float,
-    maximizing: bool,
-    start_time: float,
-    time_limit: int,
-):
-    """Alpha-Beta recursivo. Retorna None se o tempo estourar."""
-
-    # Controle de tempo
-    if time.time() - start_time >= time_limit:
-        return None
-
-    if depth == 0 or board.is_game_over():
-        return evaluate(board)
-
-    if maximizing:
-        max_eval = -math.inf
-        for move in board.legal_moves:
-            board.push(move)
-            eval_ = alphabeta(board, depth - 1, alpha, beta, False, start_time, time_limit)
-            board.pop()
-            if eval_ is None:
-                return None  # tempo esgotado
-            max_eval = max(max_eval, eval_)
-            alpha = max(alpha, eval_)
-            if beta <= alpha:
-                break  # poda beta
-        return max_eval
-    else:
-        min_eval = math.inf
-        for move in board.legal_moves:
-            board.push(move)
-            eval_ = alphabeta(board, depth - 1, alpha, beta, True, start_time, time_limit)
-            board.pop()
-            if eval_ is None:
-                return None
-            min_eval = min(min_eval, eval_)
-            beta = min(beta, eval_)
-            if beta <= alpha:
-                break  # poda alfa
-        return min_eval
-
-def alphabeta_root(board: chess.Board, depth: int, start_time: float, time_limit: int):
-    """Camada raiz do Alpha-Beta que devolve também o melhor lance encontrado."""
-
-    maximizing = board.turn  # True se brancas a jogar
-    best_move = None
-    best_value = -math.inf if maximizing else math.inf
-
-    for move in board.legal_moves:
-        if time.time() - start_time >= time_limit:
-            break
-        board.push(move)
-        value = alphabeta(board, depth - 1, -math.inf, math.inf, not maximizing, start_time, time_limit)
-        board.pop()
-        if value is None:
-            break  # Estouro de tempo dentro da busca
-        if maximizing and value > best_value:
-            best_value = value
-            best_move = move
-        elif not maximizing and value < best_value:
-            best_value = value
-            best_move = move
-    return best_value, best_move
-
-def search_best_move(board: chess.Board, time_limit: int = TIME_LIMIT):
-    """Iterative Deepening usando Alpha-Beta até esgotar o tempo."""
-
-    start_time = time.time()
-    depth = 1
-    best_move = None
-
-    while depth <= MAX_DEPTH:
-        # Verifica tempo restante
-        if time.time() - start_time >= time_limit:
-            break
-        value, move = alphabeta_root(board, depth, start_time, time_limit)
-        if move is not None:
-            best_move = move
-        else:
-            break  # tempo esgotado dentro da profundidade atual
-        depth += 1
-    return best_move
+def ai_search(board: chess.Board, time_limit: float = TIME_LIMIT, **kwargs):
+    """Busca do motor usada pela interface, limitada a MAX_DEPTH."""
+    return search_best_move(board, time_limit, max_depth=MAX_DEPTH, **kwargs)
 
 def get_chess_position(pos):
     """Converte posição do clique do mouse para posição no tabuleiro."""
@@ -308,40 +293,70 @@ def get_chess_position(pos):
     col = pos[0] // SQ_SIZE
     return row, col
 
-def convert_to_chess_move(start_sq, end_sq, board):
-    """Converte as coordenadas de tela em um movimento de xadrez."""
-    start_row, start_col = start_sq
-    end_row, end_col = end_sq
-    
-    # Converter para coordenadas chess
-    from_square = chess.square(start_col, 7 - start_row)
-    to_square = chess.square(end_col, 7 - end_row)
-    
-    # Verificar se é uma promoção
-    move = chess.Move(from_square, to_square)
-    if board.piece_at(from_square) and board.piece_at(from_square).piece_type == chess.PAWN:
-        if (board.turn == chess.WHITE and end_row == 0) or (board.turn == chess.BLACK and end_row == 7):
-            # Sempre promover para rainha
-            move = chess.Move(from_square, to_square, promotion=chess.QUEEN)
-    
-    return move
+def build_move_index(board):
+    """Indexa os lances legais da posição: casa de origem -> casa de destino -> lances.
 
-def get_valid_moves(board, start_sq):
-    """Obtém os movimentos válidos para a peça na posição start_sq."""
-    row, col = start_sq
-    square = chess.square(col, 7 - row)
-    piece = board.piece_at(square)
-    
-    if piece and piece.color == board.turn:
-        valid_moves = []
-        for move in board.legal_moves:
-            if move.from_square == square:
-                valid_moves.append(move)
-        return valid_moves
-    return []
+    É calculado uma vez por posição (após cada lance). Promoções aparecem como
+    vários lances no mesmo destino, um por peça.
+    """
+    index = {}
+    for move in board.legal_moves:
+        index.setdefault(move.from_square, {}).setdefault(move.to_square, []).append(move)
+    return index
+
+def screen_to_square(sq):
+    """Converte (linha, coluna) da tela em casa do python-chess."""
+    row, col = sq
+    return chess.square(col, 7 - row)
+
+def lookup_moves(move_index, start_sq, end_sq):
+    """Lances legais que levam de start_sq a end_sq (coordenadas de tela)."""
+    return move_index.get(screen_to_square(start_sq), {}).get(screen_to_square(end_sq), [])
+
+def get_valid_moves(move_index, start_sq):
+    """Obtém os movimentos válidos para a peça na posição start_sq (um por destino)."""
+    destinations = move_index.get(screen_to_square(start_sq), {})
+    return [moves[0] for moves in destinations.values()]
+
+def promotion_choice_rects(to_square):
+    """Casas onde as opções de promoção são mostradas, a partir da casa de destino."""
+    col = chess.square_file(to_square)
+    first_row = 7 - chess.square_rank(to_square)
+    step = 1 if first_row == 0 else -1
+    return [pygame.Rect(col * SQ_SIZE, (first_row + i * step) * SQ_SIZE, SQ_SIZE, SQ_SIZE) for i in range(len(PROMOTION_CHOICES))]
+
+def draw_promotion_choice(screen, moves, color):
+    """Desenha a escolha de peça para uma promoção pendente."""
+    sprites = render_cache.piece_sprites(SQ_SIZE)
+    for move, rect in zip(moves, promotion_choice_rects(moves[0].to_square)):
+        pygame.draw.rect(screen, pygame.Color("white"), rect)
+        pygame.draw.rect(screen, BLACK, rect, 2)
+        sprite = sprites[chess.Piece(move.promotion, color).symbol()]
+        screen.blit(sprite, sprite.get_rect(center=rect.center))
+
+def square_rect(square):
+    """Retângulo ocupado pela casa na tela."""
+    return pygame.Rect(chess.square_file(square) * SQ_SIZE, (7 - chess.square_rank(square)) * SQ_SIZE, SQ_SIZE, SQ_SIZE)
+
+def highlight_rects(move_index, sq_selected, pending_promotion):
+    """Casas cobertas pelos destaques atuais: seleção, destinos e escolha de promoção."""
+    rects = []
+    if sq_selected is not None:
+        row, col = sq_selected
+        rects.append(pygame.Rect(col * SQ_SIZE, row * SQ_SIZE, SQ_SIZE, SQ_SIZE))
+        rects.extend(square_rect(move.to_square) for move in get_valid_moves(move_index, sq_selected))
+    if pending_promotion:
+        rects.extend(promotion_choice_rects(pending_promotion[0].to_square))
+    return rects
+
+def changed_square_rects(before, after):
+    """Casas cujo conteúdo difere entre dois `board.piece_map()` (lance jogado, roque, en passant)."""
+    return [square_rect(square) for square in before.keys() | after.keys() if before.get(square) != after.get(square)]
 
 def main():
     """Função principal do jogo."""
+    init_pygame()
+
     # Permite que o jogador escolha a cor
     player_is_white = select_color()
 
@@ -349,6 +364,8 @@ def main():
     screen = pygame.display.set_mode((WIDTH + MOVE_LOG_PANEL_WIDTH, HEIGHT))
     pygame.display.set_caption("Xadrez com IA Alpha-Beta")
     clock = pygame.time.Clock()
+    pygame.event.set_blocked(pygame.MOUSEMOTION)  # movimento do mouse não muda nada na tela
+    ai_clock_event = pygame.event.custom_type()
     
     # Inicializar tabuleiro
     board = chess.Board()
@@ -357,7 +374,7 @@ def main():
     system_color = chess.BLACK if player_is_white else chess.WHITE
     human_color = chess.WHITE if player_is_white else chess.BLACK
     
-    status_font = pygame.font.SysFont("Arial", 18, True, False)
+    status_font = render_cache.font("Arial", 18, True)
     status_text = f"Você joga com as {'brancas' if human_color else 'pretas'}"
     
     # Inicializar variáveis de controle
@@ -365,39 +382,94 @@ def main():
     sq_selected = None  # (row, col)
     player_clicks = []  # [(row, col), (row, col)]
     move_log = []
+    san_log = []  # SAN de cada lance, calculada uma vez ao jogar
+    log_scroll = None  # primeira linha visível do histórico (None = acompanha o fim)
     captured_white = []  # peças brancas capturadas
     captured_black = []  # peças pretas capturadas
     game_over = False
+    move_index = {}  # lances legais da posição atual, por origem e destino
+    position_changed = True  # reindexa e verifica fim de jogo no próximo quadro
+    pending_promotion = None  # lances de promoção aguardando a escolha da peça
     ai_thinking = False
-    ai_move = None
+    ai_worker = None  # busca da IA rodando em segundo plano
+    ponder_worker = None  # busca sobre a resposta prevista do jogador
     thinking_start_time = 0
+    ai_clock_running = False
+
+    # Último estado desenhado, para redesenhar só as regiões que mudaram
+    full_redraw = True
+    drawn_pieces = {}
+    drawn_highlights = []
+    drawn_panel = None
+    drawn_status = None
+    drawn_game_over = False
     
     # Loop principal do jogo
     while running:
-        for event in pygame.event.get():
+        # Sem nada pendente, dorme até o próximo evento (o relógio da IA gera
+        # eventos periódicos enquanto ela pensa)
+        events = pygame.event.get()
+        if not events and not position_changed:
+            events = [pygame.event.wait()]
+
+        for event in events:
             if event.type == pygame.QUIT:
                 running = False
+                if ai_worker is not None:
+                    ai_worker.cancel()
+                if ponder_worker is not None:
+                    ponder_worker.cancel()
                 
             # Manipulação de teclado
             elif event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_r and game_over:  # reinicia o jogo
+                if event.key == pygame.K_r and (game_over or ai_thinking):  # reinicia o jogo
+                    if ai_worker is not None:
+                        ai_worker.cancel()
+                        ai_worker = None
+                    if ponder_worker is not None:
+                        ponder_worker.cancel()
+                        ponder_worker = None
+                    ai_thinking = False
                     board = chess.Board()
                     system_color = random.choice([chess.WHITE, chess.BLACK])
                     human_color = not system_color
                     status_text = f"Você joga com as {'brancas' if human_color else 'pretas'}"
                     sq_selected = None
                     player_clicks = []
+                    pending_promotion = None
+                    position_changed = True
                     move_log = []
+                    san_log = []
+                    log_scroll = None
                     captured_white = []
                     captured_black = []
                     game_over = False
                     
+            # Janela precisa ser redesenhada por inteiro
+            elif event.type in (pygame.VIDEOEXPOSE, pygame.WINDOWEXPOSED):
+                full_redraw = True
+
+            # Roda do mouse sobre o painel rola o histórico de lances
+            elif event.type == pygame.MOUSEWHEEL:
+                if pygame.mouse.get_pos()[0] >= WIDTH:
+                    log_scroll = scroll_move_log(log_scroll, len(san_log), -event.y * MOVE_LOG_SCROLL_STEP)
+
             # Manipulação de mouse
             elif event.type == pygame.MOUSEBUTTONDOWN and not game_over:
                 # Só processa o clique se for a vez do jogador humano
                 if board.turn == human_color and not ai_thinking:
                     location = pygame.mouse.get_pos()
-                    if location[0] < WIDTH:  # garante que o clique foi no tabuleiro
+                    move = None
+                    if pending_promotion:
+                        # Escolha da peça; clicar fora cancela a promoção
+                        rects = promotion_choice_rects(pending_promotion[0].to_square)
+                        for candidate, rect in zip(pending_promotion, rects):
+                            if rect.collidepoint(location):
+                                move = candidate
+                        pending_promotion = None
+                        sq_selected = None
+                        player_clicks = []
+                    elif location[0] < WIDTH:  # garante que o clique foi no tabuleiro
                         col = location[0] // SQ_SIZE
                         row = location[1] // SQ_SIZE
                         
@@ -411,49 +483,87 @@ def main():
                         
                         # Se tivermos dois cliques, tente fazer o movimento
                         if len(player_clicks) == 2:
-                            move = convert_to_chess_move(player_clicks[0], player_clicks[1], board)
-                            if move in board.legal_moves:
-                                # Verifica captura antes do push
-                                captured_piece = board.piece_at(move.to_square)
-                                if captured_piece:
-                                    if captured_piece.color == chess.WHITE:
-                                        captured_white.append(captured_piece.symbol())
-                                    else:
-                                        captured_black.append(captured_piece.symbol())
-                                board.push(move)
-                                move_log.append(move)
-                                sq_selected = None
-                                player_clicks = []
+                            moves = lookup_moves(move_index, player_clicks[0], player_clicks[1])
+                            if len(moves) == 1:
+                                move = moves[0]
+                            elif moves:
+                                # Promoção: pergunta a peça antes de jogar
+                                pending_promotion = sorted(moves, key=lambda m: PROMOTION_CHOICES.index(m.promotion))
                             else:
                                 player_clicks = [sq_selected]  # reset e começa com o último clique
+
+                    if move is not None:
+                        # Verifica captura antes do push
+                        captured_piece = board.piece_at(move.to_square)
+                        if captured_piece:
+                            if captured_piece.color == chess.WHITE:
+                                captured_white.append(captured_piece.symbol())
+                            else:
+                                captured_black.append(captured_piece.symbol())
+                        if ponder_worker is not None:
+                            if move == ponder_worker.ponder_move:
+                                # Acerto: a busca continua com o tempo já pensado
+                                ponder_worker.ponderhit(TIME_LIMIT)
+                                ai_worker = ponder_worker
+                                ai_thinking = True
+                                thinking_start_time = time.time()
+                            else:
+                                # Erro de previsão: descarta a busca, mantém as tabelas
+                                ponder_worker.cancel()
+                            ponder_worker = None
+                        san_log.append(board.san(move))
+                        board.push(move)
+                        move_log.append(move)
+                        position_changed = True
+                        sq_selected = None
+                        player_clicks = []
+        
+        # Após cada lance: indexa os lances legais e verifica fim de jogo (uma vez por posição)
+        if position_changed:
+            position_changed = False
+            move_index = build_move_index(board)
+            if not game_over and board.is_game_over():
+                game_over = True
+                if board.is_checkmate():
+                    winner = "Você" if board.turn != human_color else "IA"
+                    status_text = f"Xeque-mate! {winner} venceu."
+                elif board.is_stalemate():
+                    status_text = "Empate por afogamento."
+                elif board.is_insufficient_material():
+                    status_text = "Empate por material insuficiente."
+                elif board.is_fifty_moves():
+                    status_text = "Empate pela regra dos 50 lances."
+                elif board.is_repetition():
+                    status_text = "Empate por repetição."
         
-        # IA faz seu movimento se for a vez dela
+        # IA faz seu movimento se for a vez dela (a busca roda numa thread)
         if not game_over and board.turn == system_color and not ai_thinking:
             ai_thinking = True
             thinking_start_time = time.time()
+            ai_worker = SearchWorker(ai_search, board, TIME_LIMIT).start()
         
-        # Processar pensamento da IA
+        # Processar pensamento da IA sem bloquear o laço de eventos
         if ai_thinking:
-            current_time = time.time()
-            if ai_move is None:
-                # Mostra tempo de pensamento
-                elapsed = current_time - thinking_start_time
-                if elapsed < TIME_LIMIT:
-                    status_text = f"IA pensando... {elapsed:.1f}s"
-                    
-                    # Se estivermos dentro do mesmo frame, adia cálculo pesado
-                    if elapsed < 0.1:  # pequeno delay para atualizar a interface
-                        ai_move = None
-                    else:
-                        ai_move = search_best_move(board, TIME_LIMIT)
-                else:
+            elapsed = time.time() - thinking_start_time
+            if not ai_worker.done:
+                # Mostra tempo de pensamento e progresso da busca
+                status_text = f"IA pensando... {elapsed:.1f}s"
+                if ai_worker.best_move is not None:
+                    status_text += f" | prof. {ai_worker.depth} | {ai_worker.nodes} nós | {board.san(ai_worker.best_move)}"
+                if elapsed >= TIME_LIMIT + TIME_GRACE:
                     # Tempo excedido
+                    ai_worker.cancel(wait=False)
+                    ai_worker = None
                     status_text = "IA demorou demais. Você venceu!"
                     game_over = True
                     ai_thinking = False
             else:
                 # IA tomou decisão, executa o movimento
-                if ai_move in board.legal_moves:
+                ai_move = ai_worker.result
+                if ai_move is None:
+                    status_text = "IA demorou demais. Você venceu!"
+                    game_over = True
+                elif ai_move in board.legal_moves:
                     san_move = board.san(ai_move)
                     captured_piece = board.piece_at(ai_move.to_square)
                     if captured_piece:
@@ -463,43 +573,66 @@ def main():
                             captured_black.append(captured_piece.symbol())
                     board.push(ai_move)
                     move_log.append(ai_move)
+                    position_changed = True
+                    san_log.append(san_move)
                     status_text = f"IA jogou: {san_move}"
+                    if PONDER and not board.is_game_over():
+                        ponder_worker = start_ponder(ai_search, board, search_table())
                 else:
                     status_text = "IA sugeriu movimento ilegal! IA perde."
                     game_over = True
                 
                 ai_thinking = False
-                ai_move = None
-        
-        # Verificar condições de fim de jogo
-        if not game_over and board.is_game_over():
-            game_over = True
-            if board.is_checkmate():
-                winner = "Você" if board.turn != human_color else "IA"
-                status_text = f"Xeque-mate! {winner} venceu."
-            elif board.is_stalemate():
-                status_text = "Empate por afogamento."
-            elif board.is_insufficient_material():
-                status_text = "Empate por material insuficiente."
-            elif board.is_fifty_moves():
-                status_text = "Empate pela regra dos 50 lances."
-            elif board.is_repetition():
-                status_text = "Empate por repetição."
-        
-        # Renderização
-        screen.fill(pygame.Color("black"))
-        valid_moves = get_valid_moves(board, sq_selected) if sq_selected else None
-        draw_game_state(screen, board, valid_moves, sq_selected)
-        draw_move_log(screen, move_log, captured_white, captured_black)
-        
-        # Desenhar status do jogo
-        status_obj = status_font.render(status_text, True, WHITE)
-        screen.blit(status_obj, (10, HEIGHT - 30))
+                ai_worker = None
+
+        # Relógio da IA: acorda o laço a cada AI_CLOCK_INTERVAL ms só enquanto ela pensa
+        if ai_thinking != ai_clock_running:
+            pygame.time.set_timer(ai_clock_event, AI_CLOCK_INTERVAL if ai_thinking else 0)
+            ai_clock_running = ai_thinking
         
-        if game_over:
-            draw_end_game_text(screen, status_text)
+        # Renderização: só as regiões que mudaram desde o último desenho
+        pieces = board.piece_map()
+        highlights = highlight_rects(move_index, sq_selected, pending_promotion)
+        panel = (len(san_log), log_scroll, len(captured_white), len(captured_black))
+        if full_redraw or game_over != drawn_game_over:
+            dirty = [screen.get_rect()]
+        else:
+            dirty = changed_square_rects(drawn_pieces, pieces)
+            if highlights != drawn_highlights:
+                dirty += drawn_highlights + highlights
+            if panel != drawn_panel:
+                dirty.append(pygame.Rect(MOVE_LOG_AREA))
+            if status_text != drawn_status:
+                dirty.append(pygame.Rect(STATUS_AREA))
+
+        if dirty:
+            if len(dirty) > MAX_DIRTY_RECTS:
+                dirty = [dirty[0].unionall(dirty[1:])]
+            valid_moves = get_valid_moves(move_index, sq_selected) if sq_selected else None
+            for rect in dirty:
+                screen.set_clip(rect)
+                screen.fill(pygame.Color("black"))
+                draw_game_state(screen, board, valid_moves, sq_selected)
+                if pending_promotion:
+                    draw_promotion_choice(screen, pending_promotion, human_color)
+                draw_move_log(screen, san_log, captured_white, captured_black, log_scroll)
+                
+                # Desenhar status do jogo
+                status_obj = render_cache.text(status_font, status_text, WHITE)
+                screen.blit(status_obj, (10, HEIGHT - 30))
+                
+                if game_over:
+                    draw_end_game_text(screen, status_text)
+            screen.set_clip(None)
+            pygame.display.update(dirty)
+
+            full_redraw = False
+            drawn_pieces = pieces
+            drawn_highlights = highlights
+            drawn_panel = panel
+            drawn_status = status_text
+            drawn_game_over = game_over
         
-        pygame.display.flip()
         clock.tick(MAX_FPS)
 
 
@@ -507,5 +640,6 @@ if __name__ == "__main__":
     try:
         main()
     except KeyboardInterrupt:
-        pygame.quit()
+        if pygame is not None:
+            pygame.quit()
         print("\nJogo interrompido.")